@@ -16,6 +16,7 @@ def create_chat_analysis_blueprint():
     from .routes.process_routes import process_bp
     from .routes.task_routes import tasks_bp
     from .routes.search_routes import search_bp
+    from .routes.upload_routes import upload_bp
 
     chat_bp.register_blueprint(analysis_bp)
     chat_bp.register_blueprint(filter_bp)
@@ -23,6 +24,7 @@ def create_chat_analysis_blueprint():
     chat_bp.register_blueprint(process_bp)
     chat_bp.register_blueprint(tasks_bp, url_prefix='/tasks')
     chat_bp.register_blueprint(search_bp, url_prefix='/search')
+    chat_bp.register_blueprint(upload_bp, url_prefix='/upload')
 
     register_error_handlers(chat_bp)
 
@@ -58,6 +60,7 @@ def create_app():
     from api.routes.process_routes import process_bp
     from api.routes.task_routes import tasks_bp
     from api.routes.search_routes import search_bp
+    from api.routes.upload_routes import upload_bp
 
     app.register_blueprint(analysis_bp)
     app.register_blueprint(filter_bp)
@@ -65,6 +68,7 @@ def create_app():
     app.register_blueprint(process_bp)
     app.register_blueprint(tasks_bp, url_prefix='/tasks')
     app.register_blueprint(search_bp, url_prefix='/search')
+    app.register_blueprint(upload_bp, url_prefix='/upload')
 
     from api.error_handlers import register_error_handlers
     register_error_handlers(app)
@@ -3,7 +3,6 @@ import re
 from collections import Counter
 import numpy as np
 from urllib.parse import urlparse
-import emoji
 
 def analyze_word_patterns(df: pd.DataFrame, word_pattern: re.Pattern, generic_words: set, **kwargs) -> dict:
     if df.empty or 'text_content' not in df.columns: return {}
@@ -46,19 +45,19 @@ def analyze_word_patterns(df: pd.DataFrame, word_pattern: re.Pattern, generic_wo
     }
 
 def emoji_analysis(df: pd.DataFrame) -> dict:
-    if df.empty or 'has_emoji' not in df.columns: return {}
+    if df.empty or 'has_emoji' not in df.columns or 'emojis' not in df.columns: return {}
     if not df['has_emoji'].any(): return {'total_emojis_used': 0}
 
-    emoji_df = df[df['has_emoji']].copy()
+    # 'emojis' holds the emojis of each raw message, matched once during preprocessing.
+    emoji_df = df.loc[df['has_emoji'], ['sender', 'emojis']]
     if emoji_df.empty: return {'total_emojis_used': 0}
 
-    emoji_df['emoji_list'] = emoji_df['message'].apply(emoji.emoji_list)
-    all_emojis = [e['emoji'] for msg_emojis in emoji_df['emoji_list'] for e in msg_emojis]
+    all_emojis = [e for msg_emojis in emoji_df['emojis'] for e in msg_emojis]
     emoji_counter = Counter(all_emojis)
 
     user_emoji_analysis = {}
     for sender in emoji_df['sender'].unique():
-        user_emojis = [e['emoji'] for msg_emojis in emoji_df[emoji_df['sender'] == sender]['emoji_list'] for e in msg_emojis]
+        user_emojis = [e for msg_emojis in emoji_df[emoji_df['sender'] == sender]['emojis'] for e in msg_emojis]
         if not user_emojis: continue
 
         user_emoji_analysis[str(sender)] = {
@@ -8,7 +8,7 @@ def analyze_reactions(df: pd.DataFrame) -> dict:
         return {'total_reactions': 0, 'note': 'No reactions found.'}
 
     total_reactions = len(reaction_df)
-    reactions_by_type = reaction_df['reaction_type'].value_counts()
+    reactions_by_type = reaction_df['reaction_type'].value_counts().loc[lambda c: c > 0]
     reactions_given_by_user = reaction_df['sender'].value_counts()
 
     return {
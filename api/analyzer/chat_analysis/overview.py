@@ -27,7 +27,7 @@ def dataset_overview(df: pd.DataFrame) -> dict:
             'count': int(df['sender'].nunique()),
             'names': list(df['sender'].unique())
         },
-        'chat_platforms_distribution': df['source'].value_counts().to_dict(),
+        'chat_platforms_distribution': df['source'].value_counts().loc[lambda c: c > 0].to_dict(),
         'analysis_timestamp': datetime.now().isoformat(),
         'daily_average_messages': round(daily_avg_messages, 2),
     }
@@ -1,17 +1,24 @@
+import multiprocessing
 import pandas as pd
 import re
-from transformers import pipeline
-
-print("Initializing emotion classification model at startup...")
-try:
-    emotion_classifier = pipeline(
-        "text-classification",
-        model="j-hartmann/emotion-english-distilroberta-base",
-        return_all_scores=True
-    )
-    print("Emotion model initialized successfully.")
-except Exception as e:
-    print(f"FATAL: Could not load emotion model. Error: {e}")
+
+# Emotion analysis always runs in the main process; the analysis process pool's workers
+# import this package only for the CPU-heavy modules and skip transformers altogether.
+if multiprocessing.parent_process() is None:
+    from transformers import pipeline
+
+    print("Initializing emotion classification model at startup...")
+    try:
+        emotion_classifier = pipeline(
+            "text-classification",
+            model="j-hartmann/emotion-english-distilroberta-base",
+            return_all_scores=True
+        )
+        print("Emotion model initialized successfully.")
+    except Exception as e:
+        print(f"FATAL: Could not load emotion model. Error: {e}")
+        emotion_classifier = None
+else:
     emotion_classifier = None
 
 
@@ -11,7 +11,7 @@ def temporal_patterns(df: pd.DataFrame) -> dict:
     if total_activities == 0: return {}
 
     hourly_activity = analysis_df['hour'].value_counts().sort_index()
-    daily_activity_by_name = analysis_df['day_of_week'].value_counts()
+    daily_activity_by_name = analysis_df['day_of_week'].value_counts().loc[lambda c: c > 0]
     daily_activity_by_date = analysis_df['date'].value_counts().sort_index()
     monthly_activity = analysis_df['datetime'].dt.to_period('M').value_counts().sort_index()
 
@@ -31,7 +31,7 @@ def analyze_user_behavior(df: pd.DataFrame) -> dict:
             'activity_patterns': {
                 'hourly_distribution': hourly_distribution,
                 'peak_hours_of_day': user_total_df['hour'].value_counts().head(3).to_dict(),
-                'active_days_of_week': user_total_df['day_of_week'].value_counts().to_dict(),
+                'active_days_of_week': user_total_df['day_of_week'].value_counts().loc[lambda c: c > 0].to_dict(),
             },
             'content_style': {
                 'question_asking_rate_percent': user_msgs_df['has_question'].mean() * 100,
@@ -40,7 +40,7 @@ def analyze_user_behavior(df: pd.DataFrame) -> dict:
             },
             'engagement': {
                 'conversation_initiation_count': int(initiation_count),
-                'platform_usage': user_total_df['source'].value_counts().to_dict(),
+                'platform_usage': user_total_df['source'].value_counts().loc[lambda c: c > 0].to_dict(),
             }
         }
     return user_analysis
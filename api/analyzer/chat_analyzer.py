@@ -1,11 +1,15 @@
 import json
 from typing import Dict, List, Optional, Union, Callable
-import emoji
+import numpy as np
 import pandas as pd
 
 from . import chat_analysis as af
 from . import sentiment_lexicons
 from .df_parser import DfParser
+from .frame_cache import FrameCache
+from .module_cache import ModuleResultCache, module_key
+from .profiling import PerformanceRecorder
+from .scheduler import PROCESS, ModuleScheduler
 from .utils import AnalysisUtils
 
 
@@ -16,7 +20,13 @@ class ChatAnalyzer:
                  progress_callback: Optional[Callable] = None,
                  participants: Optional[List[str]] = None,
                  metadata: Optional[Dict] = None,
-                 filter_settings: Optional[Dict] = None):
+                 filter_settings: Optional[Dict] = None,
+                 compact_schema: bool = False,
+                 max_workers: int = 1,
+                 process_workers: int = 0,
+                 trace_memory: bool = False,
+                 module_cache: Optional[ModuleResultCache] = None,
+                 force_recompute: bool = False):
         self.input_type = input_type
         self.file_path = file_path_or_messages if input_type == 'file' else None
         self.data = [] if input_type == 'file' else file_path_or_messages
@@ -26,7 +36,24 @@ class ChatAnalyzer:
         self.participants = participants or []
         self.metadata = metadata or {}
         self.filter_settings = filter_settings or {}
+        # Smaller dtypes for the analysis frame: categoricals, small ints, indicator bitmasks.
+        self.compact_schema = compact_schema
+        # Threads for the report's modules, and processes for the CPU-heavy ones (0 keeps them on threads).
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        # Cost of each preprocessing stage and analysis module, reported under '_performance'.
+        self.performance = PerformanceRecorder(trace_memory)
+        # Earlier module results for the same data and arguments; force_recompute skips lookups but still stores.
+        self.module_cache = module_cache
+        self.force_recompute = force_recompute
+        self._data_fingerprint = None
         self.message_parser = DfParser(self.participants)
+        # Flattened URLs per message, filled by load_and_preprocess (see DfParser.parse_messages).
+        self.urls = []
+        self.url_offsets = None
+        self.frame_cache_hit = False
+        self._frame_cache: Optional[FrameCache] = None
+        self._frame_cache_key = None
         self.utils = AnalysisUtils()
         self.analysis_keywords = sentiment_lexicons.ANALYSIS_KEYWORDS
         self.positive_base = sentiment_lexicons.HAPPY_BASE
@@ -50,38 +77,168 @@ class ChatAnalyzer:
             ].copy()
         return personal_df
 
-    def load_and_preprocess(self):
-        """Load data and preprocess messages with comprehensive parsing."""
+    # Derived columns by the feature group that computes them. Groups are built on
+    # first use (see ensure_columns) and kept on self.df afterwards.
+    FEATURE_GROUPS = {
+        'content': DfParser.PARSED_COLUMNS + ('message_length', 'word_count', 'has_question', 'has_url'),
+        'info_sharing': DfParser.INFO_SHARING_COLUMNS,
+        'emoji': DfParser.EMOJI_COLUMNS,
+        'time': ('date', 'hour', 'day_of_week', 'is_weekend', 'time_gap_minutes', 'conversation_id'),
+    }
+    FEATURE_DEPENDENCIES = {'info_sharing': ['content'], 'emoji': ['content']}
+    DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+    def load_and_preprocess(self, frame_cache: Optional[FrameCache] = None, columns: Optional[List[str]] = None):
+        """
+        Load data into the base frame (message, sender, source, datetime) and compute
+        the derived `columns`, or every feature column when None; anything else is
+        computed when first needed. With a frame cache, columns already built from the
+        same messages and settings are reused, and newly computed ones are saved back.
+        """
         self._update_progress(10, "Loading data")
         if self.input_type == 'file':
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                self.data = json.loads(content) if content.startswith('[') else [json.loads(line) for line in
-                                                                                 content.split('\n') if line.strip()]
+            with self.performance.stage('load', 0) as stage:
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+                    self.data = json.loads(content) if content.startswith('[') else [json.loads(line) for line in
+                                                                                     content.split('\n') if line.strip()]
+                stage['rows'] = len(self.data)
         if not self.data:
             raise ValueError("No data to preprocess.")
 
-        self._update_progress(20, f"Initializing {len(self.data)} messages")
-        df = pd.DataFrame(self.data)
-        df['message'] = df['message'].astype(str).fillna('')
-        df['sender'] = df['sender'].astype('category')
-        df['datetime'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df.dropna(subset=['datetime'], inplace=True)
-        df.sort_values('datetime', inplace=True, ignore_index=True)
-        if df.empty:
-            raise ValueError("No valid messages with timestamps found.")
+        self._frame_cache = frame_cache
+        cached = None
+        if frame_cache is not None:
+            with self.performance.stage('frame_cache_lookup', len(self.data)):
+                self._frame_cache_key = self.data_fingerprint()
+                cached = frame_cache.get(self._frame_cache_key)
 
-        self._update_progress(40, "Parsing message content")
-        parsed_data = df.apply(self.message_parser.parse_message_content, axis=1)
-        parsed_df = pd.json_normalize(parsed_data)
-        df = df.join(parsed_df)
+        if cached is not None:
+            self.df, self.urls = cached
+            if 'url_count' in self.df.columns:
+                self.url_offsets = np.concatenate(([0], np.cumsum(self.df['url_count'].to_numpy(), dtype=np.int64)))
+            self.frame_cache_hit = True
+            self._update_progress(20, "Loaded preprocessed data from cache")
+        else:
+            self._update_progress(20, f"Initializing {len(self.data)} messages")
+            with self.performance.stage('build_frame', len(self.data)):
+                df = pd.DataFrame(self.data)
+                df['message'] = df['message'].astype(str).fillna('')
+                df['sender'] = df['sender'].astype('category')
+                df['datetime'] = pd.to_datetime(df['timestamp'], errors='coerce')
+                df.dropna(subset=['datetime'], inplace=True)
+                df.sort_values('datetime', inplace=True, ignore_index=True)
+                if df.empty:
+                    raise ValueError("No valid messages with timestamps found.")
+                if self.compact_schema:
+                    # Narrower dtypes throughout. Message text keeps pandas' default string
+                    # storage. With Python storage, text_content refers to the same string
+                    # objects as `message` wherever the two are equal; with Arrow storage
+                    # (pyarrow installed) each column holds its own copy of the text.
+                    df.drop(columns=['timestamp'], inplace=True)
+                    if 'source' in df.columns:
+                        df['source'] = df['source'].astype('category')
+                self.df = df
+
+        if columns is None:
+            columns = [column for group in self.FEATURE_GROUPS.values() for column in group]
+        self.ensure_columns(columns)
+        self._update_progress(70, "Preprocessing completed")
+
+    def data_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the input messages and preprocessing settings (see FrameCache.key_for)."""
+        if self._data_fingerprint is None and self.data:
+            self._data_fingerprint = FrameCache.key_for(self.data, self.participants, self.compact_schema)
+        return self._data_fingerprint
+
+    def required_columns(self, modules_to_run: Optional[List[str]] = None,
+                         exclude_info_sharing: bool = True, confidence_threshold: float = 0.4) -> List[str]:
+        """
+        Derived columns that generate_comprehensive_report will need for these modules.
+        Modules whose results the module cache already holds need none.
+        """
+        registry = self._get_analysis_registry()
+        run_queue = self._resolve_run_queue(registry, modules_to_run)
+        cached = self._cached_module_results(registry, run_queue, exclude_info_sharing, confidence_threshold)
+        columns = list(self.FEATURE_GROUPS['info_sharing']) if exclude_info_sharing else []
+        for module_name in run_queue:
+            if module_name not in cached:
+                columns.extend(registry[module_name].get('columns', []))
+        return columns
+
+    def _module_cache_keys(self, registry: Dict, run_queue: List[str], exclude_info_sharing: bool,
+                           confidence_threshold: float) -> Dict[str, str]:
+        report_args = {'exclude_info_sharing': exclude_info_sharing, 'confidence_threshold': confidence_threshold}
+        keys = {}
+        for module_name in run_queue:  # Dependencies come first, so their keys are known.
+            module_info = registry[module_name]
+            keys[module_name] = module_key(self.data_fingerprint(), module_name, module_info['func'],
+                                           module_info.get('args', {}), report_args,
+                                           [keys[dep] for dep in module_info.get('deps', []) if dep in keys])
+        return keys
+
+    def _cached_module_results(self, registry: Dict, run_queue: List[str], exclude_info_sharing: bool,
+                               confidence_threshold: float) -> Dict:
+        if self.module_cache is None or self.force_recompute or self.data_fingerprint() is None:
+            return {}
+        keys = self._module_cache_keys(registry, run_queue, exclude_info_sharing, confidence_threshold)
+        cached = {}
+        for module_name, key in keys.items():
+            result = self.module_cache.get(key)
+            if result is not None:
+                cached[module_name] = result
+        return cached
+
+    def ensure_columns(self, columns: List[str]):
+        """Computes the feature groups behind `columns` that are not on self.df yet."""
+        wanted = set(columns)
+        groups = [group for group, group_columns in self.FEATURE_GROUPS.items() if wanted.intersection(group_columns)]
+        for group in list(groups):
+            for dependency in self.FEATURE_DEPENDENCIES.get(group, []):
+                if dependency not in groups:
+                    groups.append(dependency)
+
+        computed = False
+        for group in self.FEATURE_GROUPS:  # Declaration order puts dependencies first.
+            if group in groups and not set(self.FEATURE_GROUPS[group]).issubset(self.df.columns):
+                with self.performance.stage(f"{group}_features", len(self.df)):
+                    getattr(self, f"_add_{group}_features")(self.df)
+                computed = True
 
-        self._update_progress(60, "Engineering features")
+        if computed and self._frame_cache is not None:
+            with self.performance.stage('frame_cache_store', len(self.df)):
+                self._frame_cache.put(self._frame_cache_key, self.df, self.urls)
+
+    def _add_content_features(self, df: pd.DataFrame):
+        self._update_progress(40, "Parsing message content")
+        parsed_columns, self.urls, self.url_offsets = self.message_parser.parse_messages(
+            df['message'].tolist(), df['sender'].tolist()
+        )
+        for column, values in parsed_columns.items():
+            df[column] = values
         df['message_length'] = df['text_content'].str.len()
         df['word_count'] = df['text_content'].str.split().str.len()
-        df['has_emoji'] = df['text_content'].apply(lambda x: bool(emoji.emoji_list(x)))
         df['has_question'] = df['text_content'].str.contains(r'\?', na=False)
-        df['has_url'] = df['urls'].apply(len) > 0
+        df['has_url'] = df['url_count'] > 0
+        if self.compact_schema:
+            df['message_length'] = df['message_length'].astype('int32')
+            df['word_count'] = df['word_count'].astype('int32')
+
+    def _add_info_sharing_features(self, df: pd.DataFrame):
+        self._update_progress(50, "Scoring information sharing")
+        scored = self.message_parser.score_info_sharing(df['text_content'].tolist(), compact=self.compact_schema)
+        for column, values in scored.items():
+            df[column] = values
+
+    def _add_emoji_features(self, df: pd.DataFrame):
+        self._update_progress(55, "Matching emojis")
+        inline_reactions = (df['reaction_type'].notna() & ~df['is_reaction']).to_numpy()
+        matched = self.message_parser.match_emojis(df['message'].tolist(), df['text_content'].tolist(), inline_reactions)
+        for column, values in matched.items():
+            df[column] = values
+
+    def _add_time_features(self, df: pd.DataFrame):
+        self._update_progress(60, "Engineering time features")
         dt = df['datetime'].dt
         df['date'] = pd.to_datetime(dt.date)
         df['hour'] = dt.hour
@@ -89,8 +246,15 @@ class ChatAnalyzer:
         df['is_weekend'] = dt.weekday >= 5
         df['time_gap_minutes'] = df['datetime'].diff().dt.total_seconds().fillna(0) / 60
         df['conversation_id'] = (df['time_gap_minutes'] > 60).cumsum().astype(int)
-        self.df = df
-        self._update_progress(70, "Preprocessing completed")
+        if self.compact_schema:
+            df['day_of_week'] = pd.Categorical(df['day_of_week'], categories=self.DAYS_OF_WEEK, ordered=True)
+            df['hour'] = df['hour'].astype('int8')
+            df['conversation_id'] = df['conversation_id'].astype('int32')
+
+    def memory_report(self) -> Dict:
+        report = self.utils.frame_memory_report(self.df)
+        report['schema'] = 'compact' if self.compact_schema else 'default'
+        return report
 
     def _update_progress(self, progress_percent: float, step_name: str):
         if self.progress_callback:
@@ -106,8 +270,14 @@ class ChatAnalyzer:
         if self.df.empty:
             return {"error": "DataFrame is empty, cannot generate report."}
 
-        analysis_df = self.filter_personal_messages(exclude_info_sharing=exclude_info_sharing,
-                                                    confidence_threshold=confidence_threshold)
+        ANALYSIS_REGISTRY = self._get_analysis_registry()
+        run_queue = self._resolve_run_queue(ANALYSIS_REGISTRY, modules_to_run)
+        self.ensure_columns(self.required_columns(run_queue, exclude_info_sharing, confidence_threshold))
+        cached = self._cached_module_results(ANALYSIS_REGISTRY, run_queue, exclude_info_sharing, confidence_threshold)
+
+        with self.performance.stage('filter_personal_messages', len(self.df)):
+            analysis_df = self.filter_personal_messages(exclude_info_sharing=exclude_info_sharing,
+                                                        confidence_threshold=confidence_threshold)
 
         if exclude_info_sharing:
             total_messages = len(self.df)
@@ -118,92 +288,112 @@ class ChatAnalyzer:
                 'personal_messages': len(analysis_df),
                 'info_sharing_percentage': round((info_sharing_messages / total_messages) * 100,
                                                  2) if total_messages > 0 else 0,
-                'info_sharing_by_category': self.df[self.df['is_info_sharing']][
-                    'info_sharing_category'].value_counts().to_dict(),
+                'info_sharing_by_category': self.df[self.df['is_info_sharing']]['info_sharing_category']
+                    .value_counts().loc[lambda c: c > 0].to_dict(),
                 'confidence_threshold_used': confidence_threshold
             }
 
-        ANALYSIS_REGISTRY = self._get_analysis_registry()
-        run_queue = []
-        active_modules = modules_to_run if modules_to_run else list(ANALYSIS_REGISTRY.keys())
-        for module_name in active_modules:
-            if module_name not in ANALYSIS_REGISTRY: continue
-            for dep in ANALYSIS_REGISTRY[module_name]['deps']:
-                if dep not in run_queue: run_queue.append(dep)
-            if module_name not in run_queue: run_queue.append(module_name)
-
-        total_modules, start_progress, progress_range = len(run_queue), 75, 25
-
-        # --- THIS IS THE NEW, STANDARDIZED LOOP ---
-        for i, module_name in enumerate(run_queue):
-            current_progress = start_progress + (i / total_modules) * progress_range
-            self._update_progress(current_progress, f"Running {module_name}")
-            try:
-                module_info = ANALYSIS_REGISTRY[module_name]
-
-                # Start with static arguments
-                kwargs = module_info.get('args', {}).copy()
+        start_progress, progress_range = 75, 25
 
-                # Automatically inject data from dependencies based on our convention
-                for dependency_key in module_info.get('deps', []):
-                    # Construct the parameter name (e.g., "response_metrics" -> "response_metrics_data")
-                    arg_name = f"{dependency_key}_data"
-                    # Fetch the result from the dependency and add it to kwargs
-                    kwargs[arg_name] = self.report.get(dependency_key, {})
+        def on_module_progress(done: int, total: int, step_name: str):
+            self._update_progress(start_progress + (done / total) * progress_range, step_name)
 
-                # The function call is now completely generic
-                result = module_info['func'](analysis_df, **kwargs)
-                self.report[module_name] = result
-
-            except Exception as e:
-                error_msg = f"Error in module '{module_name}': {type(e).__name__} - {e}"
-                print(error_msg)
-                self.report[module_name] = {"error": error_msg}
+        scheduler = ModuleScheduler(ANALYSIS_REGISTRY, self.max_workers, self.process_workers,
+                                    self.performance.trace_memory)
+        results, metrics = scheduler.run(run_queue, analysis_df, self._process_columns(ANALYSIS_REGISTRY, run_queue),
+                                         on_module_progress, precomputed=cached)
+        self.report.update(results)
+        self.performance.modules.update(metrics)
+        for module_name in cached:
+            self.performance.modules[module_name] = {'rows': len(analysis_df), 'wall_seconds': 0.0,
+                                                     'cpu_seconds': 0.0, 'cached': True}
+        if self.module_cache is not None and self.data_fingerprint() is not None:
+            keys = self._module_cache_keys(ANALYSIS_REGISTRY, run_queue, exclude_info_sharing, confidence_threshold)
+            for module_name, result in results.items():
+                # Errors may be transient (a model that failed to load), so they are never reused.
+                if module_name not in cached and not (isinstance(result, dict) and 'error' in result):
+                    self.module_cache.put(keys[module_name], module_name,
+                                          self.utils.convert_to_serializable(result))
 
         if self.metadata: self.report['metadata'] = self.metadata
         if self.filter_settings: self.report['filter_settings'] = self.filter_settings
+        self.report['_performance'] = self.performance.report()
         self._update_progress(100, "Analysis completed")
         return self.utils.convert_to_serializable(self.report)
 
+    @staticmethod
+    def _resolve_run_queue(registry: Dict, modules_to_run: Optional[List[str]]) -> List[str]:
+        run_queue = []
+        active_modules = modules_to_run if modules_to_run else list(registry.keys())
+        for module_name in active_modules:
+            if module_name not in registry: continue
+            for dep in registry[module_name]['deps']:
+                if dep not in run_queue: run_queue.append(dep)
+            if module_name not in run_queue: run_queue.append(module_name)
+        return run_queue
+
+    def _process_columns(self, registry: Dict, run_queue: List[str]) -> List[str]:
+        """The frame columns that modules run in the process pool need: the base columns plus the ones they declare."""
+        derived = {column for group in self.FEATURE_GROUPS.values() for column in group}
+        declared = {column for name in run_queue if registry[name].get('executor') == PROCESS
+                    for column in registry[name]['columns']}
+        return [column for column in self.df.columns if column not in derived or column in declared]
+
     def _get_analysis_registry(self) -> Dict:
+        # 'columns' lists the derived frame columns a module reads; see FEATURE_GROUPS.
+        # 'executor': PROCESS sends a CPU-bound module to the scheduler's process pool.
+        thematic_columns = ['is_reaction', 'text_content', 'message_length']
         return {
-            'dataset_overview': {'func': af.dataset_overview, 'deps': [], 'args': {}},
-            'first_last_messages': {'func': af.first_last_messages, 'deps': [], 'args': {}},
-            'temporal_patterns': {'func': af.temporal_patterns, 'deps': [], 'args': {}},
-            'word_analysis': {'func': af.analyze_word_patterns, 'deps': [],
+            'dataset_overview': {'func': af.dataset_overview, 'deps': [], 'columns': ['is_reaction'], 'args': {}},
+            'first_last_messages': {'func': af.first_last_messages, 'deps': [], 'columns': ['is_reaction'],
+                                    'args': {}},
+            'temporal_patterns': {'func': af.temporal_patterns, 'deps': [],
+                                  'columns': ['hour', 'day_of_week', 'date', 'is_weekend'], 'args': {}},
+            'word_analysis': {'func': af.analyze_word_patterns, 'deps': [], 'columns': ['text_content'],
                               'args': {'word_pattern': self.message_parser.word_pattern,
                                        'generic_words': self.dynamic_generic_words}},
-            'topic_modeling': {'func': af.analyze_topics, 'deps': [],
-                               'args': {'generic_words': self.dynamic_generic_words}},
-            'user_behavior': {'func': af.analyze_user_behavior, 'deps': [], 'args': {}},
-            'argument_analysis': {'func': af.analyze_argument_language, 'deps': [],
-                                  'args': {'argument_words': self.analysis_keywords['ARGUMENT']}},
-            'sad_tone_analysis': {'func': af.analyze_sad_tone, 'deps': [],
-                                  'args': {'sad_words': self.analysis_keywords['SAD']}},
-            'romance_tone_analysis': {'func': af.analyze_romance_tone, 'deps': [],
-                                      'args': {'romance_words': self.analysis_keywords['ROMANTIC']}},
-            'happy_tone_analysis': {'func': af.analyze_happy_tone, 'deps': [],
-                                    'args': {'positive_words': self.analysis_keywords['HAPPY']}},
-            'sexual_tone_analysis': {'func': af.analyze_sexual_tone, 'deps': [],
-                                     'args': {'sexual_words': self.sexual_content}},
-            'sentiment_analysis': {'func': af.analyze_sentiment, 'deps': [],
+            'topic_modeling': {'func': af.analyze_topics, 'deps': [], 'columns': ['text_content'],
+                               'executor': PROCESS, 'args': {'generic_words': self.dynamic_generic_words}},
+            'user_behavior': {'func': af.analyze_user_behavior, 'deps': [],
+                              'columns': ['is_reaction', 'conversation_id', 'hour', 'day_of_week', 'message_length',
+                                          'word_count', 'has_question', 'has_emoji', 'has_url'],
+                              'args': {}},
+            'argument_analysis': {'func': af.analyze_argument_language, 'deps': [], 'columns': thematic_columns,
+                                  'executor': PROCESS, 'args': {'argument_words': self.analysis_keywords['ARGUMENT']}},
+            'sad_tone_analysis': {'func': af.analyze_sad_tone, 'deps': [], 'columns': thematic_columns,
+                                  'executor': PROCESS, 'args': {'sad_words': self.analysis_keywords['SAD']}},
+            'romance_tone_analysis': {'func': af.analyze_romance_tone, 'deps': [], 'columns': thematic_columns,
+                                      'executor': PROCESS, 'args': {'romance_words': self.analysis_keywords['ROMANTIC']}},
+            'happy_tone_analysis': {'func': af.analyze_happy_tone, 'deps': [], 'columns': thematic_columns,
+                                    'executor': PROCESS, 'args': {'positive_words': self.analysis_keywords['HAPPY']}},
+            'sexual_tone_analysis': {'func': af.analyze_sexual_tone, 'deps': [], 'columns': thematic_columns,
+                                     'executor': PROCESS, 'args': {'sexual_words': self.sexual_content}},
+            'sentiment_analysis': {'func': af.analyze_sentiment, 'deps': [], 'columns': ['text_content'],
                                    'args': {'word_pattern': self.message_parser.word_pattern,
                                             'positive_words': self.positive_base,
                                             'negative_words': self.negative_base}},
-            'unbroken_streaks': {'func': af.analyze_unbroken_streaks, 'deps': [], 'args': {}},
-            'ghost_periods': {'func': af.detect_ghost_periods, 'deps': [], 'args': {}},
-            'icebreaker_analysis': {'func': af.icebreaker_analysis, 'deps': [], 'args': {}},
-            'response_metrics': {'func': af.calculate_response_metrics, 'deps': [], 'args': {}},
-            'conversation_patterns': {'func': af.analyze_conversation_patterns, 'deps': [], 'args': {}},
-            'rapid_fire_analysis': {'func': af.analyze_rapid_fire_conversations, 'deps': [], 'args': {}},
-            'reaction_analysis': {'func': af.analyze_reactions, 'deps': [], 'args': {}},
-            'emoji_analysis': {'func': af.emoji_analysis, 'deps': [], 'args': {}},
-            'question_analysis': {'func': af.analyze_questions, 'deps': [],
+            'unbroken_streaks': {'func': af.analyze_unbroken_streaks, 'deps': [], 'columns': ['is_reaction', 'date'],
+                                 'args': {}},
+            'ghost_periods': {'func': af.detect_ghost_periods, 'deps': [], 'columns': ['time_gap_minutes'],
+                              'args': {}},
+            'icebreaker_analysis': {'func': af.icebreaker_analysis, 'deps': [],
+                                    'columns': ['is_reaction', 'conversation_id'], 'args': {}},
+            'response_metrics': {'func': af.calculate_response_metrics, 'deps': [], 'columns': ['is_reaction'],
+                                 'args': {}},
+            'conversation_patterns': {'func': af.analyze_conversation_patterns, 'deps': [],
+                                      'columns': ['is_reaction', 'conversation_id'], 'args': {}},
+            'rapid_fire_analysis': {'func': af.analyze_rapid_fire_conversations, 'deps': [],
+                                    'columns': ['is_reaction', 'conversation_id'], 'args': {}},
+            'reaction_analysis': {'func': af.analyze_reactions, 'deps': [], 'columns': ['is_reaction', 'reaction_type'],
+                                  'args': {}},
+            'emoji_analysis': {'func': af.emoji_analysis, 'deps': [], 'columns': ['has_emoji', 'emojis'], 'args': {}},
+            'question_analysis': {'func': af.analyze_questions, 'deps': [], 'columns': ['has_question', 'text_content'],
                                   'args': {'sentence_pattern': self.message_parser.sentence_pattern}},
-            'link_analysis': {'func': af.analyze_shared_links, 'deps': [], 'args': {'url_pattern': self.message_parser.url_pattern}},
-            'attachment_analysis': {'func': af.analyze_attachments, 'deps': [], 'args': {}},
+            'link_analysis': {'func': af.analyze_shared_links, 'deps': [], 'columns': ['has_url', 'text_content'],
+                              'args': {'url_pattern': self.message_parser.url_pattern}},
+            'attachment_analysis': {'func': af.analyze_attachments, 'deps': [],
+                                    'columns': ['is_attachment', 'text_content'], 'args': {}},
             'relationship_metrics': {'func': af.calculate_relationship_metrics,
-                                     'deps': ['response_metrics'], 'args': {}},
-            'emotion_analysis': {'func': af.analyze_emotions_ml, 'deps': [], 'args': {}},
-
-        }
\ No newline at end of file
+                                     'deps': ['response_metrics'], 'columns': ['is_reaction', 'date'], 'args': {}},
+            'emotion_analysis': {'func': af.analyze_emotions_ml, 'deps': [], 'columns': ['text_content'], 'args': {}},
+        }
@@ -1,8 +1,48 @@
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .emoji_matcher import find_emojis
+from .info_sharing import detect_info_sharing, encode_indicators
 
 
 class DfParser:
+    REACTION_PATTERNS = [
+        re.compile(r'^(Liked|Laughed at|Emphasized|Loved|Disliked|Questioned)\s+"(.*)"$', re.IGNORECASE),
+        re.compile(r'^(Liked|Laughed at|Emphasized|Loved|Disliked|Questioned)\s+(.*)$', re.IGNORECASE),
+        re.compile(r'^You reacted (.*) to this message$', re.IGNORECASE),
+        re.compile(r'^(.+) reacted (.*) to this message$', re.IGNORECASE),
+        re.compile(r'^Reacted with (.+) to (.*)$', re.IGNORECASE),
+        re.compile(r'^(.+) reacted to your message with (.+)$', re.IGNORECASE),
+        re.compile(r'^You reacted to (.+)\'s message with (.+)$', re.IGNORECASE),
+        re.compile(r'^(.+) (loved|liked|disliked|laughed at|was amazed by|got angry at) your message$',
+                   re.IGNORECASE),
+        re.compile(r'^You (loved|liked|disliked|laughed at|were amazed by|got angry at) (.+)\'s message$',
+                   re.IGNORECASE),
+        re.compile(
+            r'^(You |[a-zA-Z\s]+?)(loved|liked|disliked|laughed at|emphasized|questioned) (an image|a message|a photo|a video)$',
+            re.IGNORECASE),
+        re.compile(r'^Reacted\s+(.+?)\s+to a message$', re.IGNORECASE),
+        re.compile(r'^(.+) added (😀|😂|😢|😡|👍|👎|❤️|😍|😮|😠|🔥|💯|👏|🎉) to (.+)$', re.IGNORECASE),
+        re.compile(r'^You added (😀|😂|😢|😡|👍|👎|❤️|😍|😮|😠|🔥|💯|👏|🎉) to (.+)$', re.IGNORECASE),
+        re.compile(r'reacted|reaction', re.IGNORECASE),
+    ]
+    REACTION_SKIP_WORDS = {'you', 'your', 'to', 'this', 'message', 'an', 'a', 'the', 'with'}
+    REACTION_MAPPING = {
+        'loved': 'love', 'liked': 'like', 'disliked': 'dislike', 'laughed at': 'laugh',
+        'emphasized': 'emphasize', 'questioned': 'question', 'was amazed by': 'wow',
+        'got angry at': 'angry', '😀': 'happy', '😂': 'laugh', '😢': 'sad',
+        '😡': 'angry', '👍': 'like', '👎': 'dislike', '❤️': 'love', '😍': 'love',
+        '😮': 'wow', '😠': 'angry', '🔥': 'fire', '💯': 'hundred', '👏': 'clap', '🎉': 'celebrate'
+    }
+    # Frame columns produced by parse_messages, score_info_sharing and match_emojis.
+    PARSED_COLUMNS = ('is_reaction', 'is_attachment', 'reaction_type', 'text_content', 'url_count')
+    INFO_SHARING_COLUMNS = ('is_info_sharing', 'info_sharing_confidence', 'info_sharing_category',
+                            'info_sharing_indicators')
+    EMOJI_COLUMNS = ('emojis', 'has_emoji')
+
     def __init__(self, participants: List[str]):
         self.participants = participants
         self.url_pattern = re.compile(r'((?:https?://|www\.)[a-zA-Z0-9./\?=\-_%&@#~;,\+]+[a-zA-Z0-9/])')
@@ -11,6 +51,11 @@ class DfParser:
         self.english_pattern = re.compile(r'\b[a-zA-Z]+\b')
         self.khmer_pattern = re.compile(r'[\u1780-\u17FF]+')
         self.sentence_pattern = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s')
+        self.inline_reaction_pattern = self._build_dynamic_inline_reaction_pattern()
+        # The inline pattern is anchored on a trailing participant name; checking that
+        # suffix first avoids its quadratic scan over every other message.
+        self._participant_suffixes = tuple(participants)
+        self._attachment_prefix_patterns: Dict[str, re.Pattern] = {}
 
     def _build_dynamic_inline_reaction_pattern(self) -> Optional[re.Pattern]:
         """Builds a regex that uses the emoji library for comprehensive emoji matching."""
@@ -31,154 +76,7 @@ class DfParser:
 
     @staticmethod
     def _detect_info_sharing(message: str) -> Dict[str, Any]:
-        if not isinstance(message, str) or len(message.strip()) == 0:
-            return {
-                'is_info_sharing': False,
-                'confidence': 0.0,
-                'indicators': [],
-                'category': None
-            }
-
-        message = message.strip()
-        indicators = []
-        confidence_score = 0.0
-        category = None
-
-        # Pattern 1: News/Article indicators
-        news_patterns = [
-            r'\b(has since|according to|it is reported|sources say|officials said)\b',
-            r'\b(government|ministry|official|spokesperson|representative)\b',
-            r'\b(announced|declared|stated|confirmed|revealed)\b',
-            r'\b(policy|agreement|treaty|declaration|resolution)\b',
-            r'\b(meeting|conference|summit|talks|negotiations)\b',
-            r'\b(dispute|conflict|tension|dialogue|consultation)\b'
-        ]
-
-        # Pattern 2: Formal announcements
-        announcement_patterns = [
-            r'\b(call for papers|deadline|submission|application)\b',
-            r'\b(pleased to announce|we are announcing|it is announced)\b',
-            r'\b(timeline|schedule|dates|registration)\b',
-            r'\b(conference|workshop|seminar|symposium)\b',
-            r'\b(partnership|collaboration|in cooperation with)\b',
-            r'\b(interested candidates|applicants|participants)\b'
-        ]
-
-        # Pattern 3: Academic/Formal writing indicators
-        formal_patterns = [
-            r'\b(furthermore|however|nevertheless|therefore|consequently)\b',
-            r'\b(in conclusion|in summary|to summarize|in other words)\b',
-            r'\b(research|study|analysis|findings|methodology)\b',
-            r'\b(implementation|framework|guidelines|provisions)\b'
-        ]
-
-        # Pattern 4: Quotation marks around large blocks (news quotes)
-        quote_patterns = [
-            r'"[^"]{100,}"',  # Long quoted text (100+ chars)
-            r'["""][^"""]{100,}["""]'  # Smart quotes with long content
-        ]
-
-        # Pattern 5: Formal dates and times
-        date_patterns = [
-            r'\b\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\b',
-            r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-            r'\b\d{2}:\d{2}\s*(AM|PM|am|pm)\b'
-        ]
-
-        # Pattern 6: Organizational/Institutional names
-        org_patterns = [
-            r'\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b',  # Acronyms like ASEAN, DOC, COC
-            r'\b(Academy|University|Institute|Foundation|Organization|Association)\b',
-            r'\b(Cambodia|ASEAN|China|Beijing|Ministry|Department)\b'
-        ]
-
-        # Pattern 7: Professional/Academic language
-        professional_patterns = [
-            r'\b(implementation|coordination|consultations|provisions|bilateral)\b',
-            r'\b(digital transformation|skills gap|practitioners|candidates)\b',
-            r'\b(volume|publication|manuscript|submission|proposal)\b'
-        ]
-
-        # Check each pattern category
-        pattern_categories = [
-            ('news', news_patterns),
-            ('announcement', announcement_patterns),
-            ('formal', formal_patterns),
-            ('academic', professional_patterns)
-        ]
-
-        for cat_name, patterns in pattern_categories:
-            matches = 0
-            for pattern in patterns:
-                if re.search(pattern, message, re.IGNORECASE):
-                    matches += 1
-                    indicators.append(f"{cat_name}_language")
-
-            if matches >= 2:  # Multiple matches in same category
-                confidence_score += 0.3
-                if not category:
-                    category = cat_name
-
-        # Check quote patterns
-        for pattern in quote_patterns:
-            if re.search(pattern, message):
-                confidence_score += 0.4
-                indicators.append('long_quotes')
-                if not category:
-                    category = 'quoted_content'
-
-        # Check date patterns
-        date_matches = sum(1 for pattern in date_patterns if re.search(pattern, message))
-        if date_matches >= 2:
-            confidence_score += 0.2
-            indicators.append('formal_dates')
-
-        # Check organizational patterns
-        org_matches = sum(1 for pattern in org_patterns if re.search(pattern, message))
-        if org_matches >= 3:
-            confidence_score += 0.3
-            indicators.append('organizational_names')
-
-        # Additional heuristics
-        word_count = len(message.split())
-
-        # Very long messages with formal structure
-        if word_count > 100:
-            sentences = re.split(r'[.!?]+', message)
-            valid_sentences = [s for s in sentences if s.strip()]
-            if valid_sentences:
-                avg_sentence_length = sum(len(s.split()) for s in valid_sentences) / len(valid_sentences)
-
-                if avg_sentence_length > 15:  # Long, complex sentences
-                    confidence_score += 0.2
-                    indicators.append('complex_sentences')
-
-        # Check for lack of personal pronouns (less personal)
-        personal_pronouns = re.findall(r'\b(I|me|my|mine|you|your|yours|we|us|our|ours)\b', message, re.IGNORECASE)
-        pronoun_ratio = len(personal_pronouns) / max(word_count, 1)
-
-        if pronoun_ratio < 0.02 and word_count > 50:  # Very few personal pronouns in longer text
-            confidence_score += 0.2
-            indicators.append('impersonal_tone')
-
-        # Check for formal punctuation patterns
-        if re.search(r':\s*$', message) or message.count(';') >= 2:
-            confidence_score += 0.1
-            indicators.append('formal_punctuation')
-
-        # Cap confidence at 1.0
-        confidence_score = min(confidence_score, 1.0)
-
-        # Determine if it's information sharing (threshold: 0.4)
-        is_info_sharing = confidence_score >= 0.4
-
-        return {
-            'is_info_sharing': is_info_sharing,
-            'confidence': round(confidence_score, 3),
-            'indicators': list(set(indicators)),  # Remove duplicates
-            'category': category,
-            'word_count': word_count
-        }
+        return detect_info_sharing(message)
 
     @staticmethod
     def _find_reaction_type(message: str) -> Optional[str]:
@@ -187,52 +85,126 @@ class DfParser:
             return None
 
         message = message.strip()
-        reaction_patterns = [
-            re.compile(r'^(Liked|Laughed at|Emphasized|Loved|Disliked|Questioned)\s+"(.*)"$', re.IGNORECASE),
-            re.compile(r'^(Liked|Laughed at|Emphasized|Loved|Disliked|Questioned)\s+(.*)$', re.IGNORECASE),
-            re.compile(r'^You reacted (.*) to this message$', re.IGNORECASE),
-            re.compile(r'^(.+) reacted (.*) to this message$', re.IGNORECASE),
-            re.compile(r'^Reacted with (.+) to (.*)$', re.IGNORECASE),
-            re.compile(r'^(.+) reacted to your message with (.+)$', re.IGNORECASE),
-            re.compile(r'^You reacted to (.+)\'s message with (.+)$', re.IGNORECASE),
-            re.compile(r'^(.+) (loved|liked|disliked|laughed at|was amazed by|got angry at) your message$',
-                       re.IGNORECASE),
-            re.compile(r'^You (loved|liked|disliked|laughed at|were amazed by|got angry at) (.+)\'s message$',
-                       re.IGNORECASE),
-            re.compile(
-                r'^(You |[a-zA-Z\s]+?)(loved|liked|disliked|laughed at|emphasized|questioned) (an image|a message|a photo|a video)$',
-                re.IGNORECASE),
-            re.compile(r'^Reacted\s+(.+?)\s+to a message$', re.IGNORECASE),
-            re.compile(r'^(.+) added (😀|😂|😢|😡|👍|👎|❤️|😍|😮|😠|🔥|💯|👏|🎉) to (.+)$', re.IGNORECASE),
-            re.compile(r'^You added (😀|😂|😢|😡|👍|👎|❤️|😍|😮|😠|🔥|💯|👏|🎉) to (.+)$', re.IGNORECASE),
-            re.compile(r'reacted|reaction', re.IGNORECASE),
-        ]
-
-        for pattern in reaction_patterns:
+        for pattern in DfParser.REACTION_PATTERNS:
             match = pattern.search(message)
             if match:
                 groups = match.groups()
                 for group in groups:
                     if group and group.strip():
                         clean_group = group.strip().lower()
-                        skip_words = {'you', 'your', 'to', 'this', 'message', 'an', 'a', 'the', 'with'}
-                        if clean_group not in skip_words and len(clean_group) > 1:
-                            reaction_mapping = {
-                                'loved': 'love', 'liked': 'like', 'disliked': 'dislike', 'laughed at': 'laugh',
-                                'emphasized': 'emphasize', 'questioned': 'question', 'was amazed by': 'wow',
-                                'got angry at': 'angry', '😀': 'happy', '😂': 'laugh', '😢': 'sad',
-                                '😡': 'angry', '👍': 'like', '👎': 'dislike', '❤️': 'love', '😍': 'love',
-                                '😮': 'wow', '😠': 'angry', '🔥': 'fire', '💯': 'hundred', '👏': 'clap', '🎉': 'celebrate'
-                            }
-                            return reaction_mapping.get(clean_group, clean_group)
+                        if clean_group not in DfParser.REACTION_SKIP_WORDS and len(clean_group) > 1:
+                            return DfParser.REACTION_MAPPING.get(clean_group, clean_group)
                 return 'reaction'
         return None
 
+    def _attachment_prefix_pattern(self, sender: str) -> re.Pattern:
+        pattern = self._attachment_prefix_patterns.get(sender)
+        if pattern is None:
+            pattern = re.compile(rf'^{re.escape(sender)}\s+sent\s+an\s+attachment\.', re.IGNORECASE)
+            self._attachment_prefix_patterns[sender] = pattern
+        return pattern
+
+    def _ends_with_participant(self, text: str) -> bool:
+        # '$' also matches just before a single trailing newline.
+        return text.endswith(self._participant_suffixes) or (
+            text.endswith('\n') and text[:-1].endswith(self._participant_suffixes))
+
+    def parse_messages(self, messages: List[str], senders: List[str]) -> Tuple[Dict[str, Any], List[str], np.ndarray]:
+        """
+        Batch form of parse_message_content over a whole message column, without the
+        info-sharing scores (see score_info_sharing). Results go straight into typed
+        buffers: bool arrays for the flags, a categorical reaction type, and the URLs of
+        every message flattened into one list addressed by offsets.
+
+        Returns (columns keyed by PARSED_COLUMNS, urls, url_offsets); the URLs of row i
+        are urls[url_offsets[i]:url_offsets[i + 1]].
+        """
+        n = len(messages)
+        is_reaction = np.zeros(n, dtype=bool)
+        is_attachment = np.zeros(n, dtype=bool)
+        reaction_codes = np.full(n, -1, dtype=np.int32)
+        reaction_index: Dict[str, int] = {}
+        text_content = np.empty(n, dtype=object)
+        urls: List[str] = []
+        url_offsets = np.zeros(n + 1, dtype=np.int64)
+
+        for i, (message, sender) in enumerate(zip(messages, senders)):
+            result = self._parse_one(message, sender, info_sharing=False)
+            is_reaction[i] = result['is_reaction']
+            is_attachment[i] = result['is_attachment']
+            if result['reaction_type'] is not None:
+                reaction_codes[i] = reaction_index.setdefault(result['reaction_type'], len(reaction_index))
+            text_content[i] = result['text_content']
+            urls.extend(result['urls'])
+            url_offsets[i + 1] = len(urls)
+
+        columns = {
+            'is_reaction': is_reaction,
+            'is_attachment': is_attachment,
+            'reaction_type': pd.Categorical.from_codes(reaction_codes, categories=list(reaction_index)),
+            'text_content': text_content,
+            'url_count': np.diff(url_offsets).astype(np.int32),
+        }
+        return columns, urls, url_offsets
+
+    def score_info_sharing(self, texts: List[str], compact: bool = False) -> Dict[str, Any]:
+        """
+        Info-sharing columns for the parsed text_content of each message, matching what
+        parse_message_content reports: float32 confidences and a categorical category.
+        With `compact`, info_sharing_indicators holds a uint16 bitmask per row (see
+        info_sharing.decode_indicators) instead of a list.
+        """
+        n = len(texts)
+        is_info_sharing = np.zeros(n, dtype=bool)
+        confidence = np.zeros(n, dtype=np.float32)
+        category_codes = np.full(n, -1, dtype=np.int32)
+        category_index: Dict[str, int] = {}
+        indicators = np.zeros(n, dtype=np.uint16) if compact else np.empty(n, dtype=object)
+
+        for i, text in enumerate(texts):
+            if not text:
+                if not compact:
+                    indicators[i] = []
+                continue
+            info_result = self._detect_info_sharing(text)
+            is_info_sharing[i] = info_result['is_info_sharing']
+            confidence[i] = info_result['confidence']
+            if info_result['category'] is not None:
+                category_codes[i] = category_index.setdefault(info_result['category'], len(category_index))
+            if compact:
+                indicators[i] = encode_indicators(info_result['indicators'])
+            else:
+                indicators[i] = info_result['indicators']
+
+        return {
+            'is_info_sharing': is_info_sharing,
+            'info_sharing_confidence': confidence,
+            'info_sharing_category': pd.Categorical.from_codes(category_codes, categories=list(category_index)),
+            'info_sharing_indicators': indicators,
+        }
+
+    @staticmethod
+    def match_emojis(messages: List[str], texts: List[str], inline_reactions: np.ndarray) -> Dict[str, Any]:
+        """
+        Emojis are matched once per raw message into an `emojis` column of tuples that
+        later modules reuse; `has_emoji` still reflects the parsed text_content. Rows in
+        `inline_reactions` keep only the text before the reaction, so they are rescanned.
+        """
+        n = len(messages)
+        emojis = np.empty(n, dtype=object)
+        has_emoji = np.zeros(n, dtype=bool)
+        for i, (message, text) in enumerate(zip(messages, texts)):
+            message_emojis = find_emojis(message)
+            emojis[i] = message_emojis
+            if message_emojis and text:
+                has_emoji[i] = bool(find_emojis(text)) if inline_reactions[i] else True
+        return {'emojis': emojis, 'has_emoji': has_emoji}
+
     def parse_message_content(self, row) -> dict:
         """Parse message content to identify reactions, attachments, and info sharing."""
-        message = row['message']
-        sender = row['sender']
+        return self._parse_one(row['message'], row['sender'])
 
+    def _parse_one(self, message: str, sender, info_sharing: bool = True) -> dict:
         result = {
             'is_reaction': False,
             'is_attachment': False,
@@ -252,14 +224,13 @@ class DfParser:
 
         # Check for attachments
         if sender:
-            prefix_pattern = re.compile(rf'^{re.escape(sender)}\s+sent\s+an\s+attachment\.', re.IGNORECASE)
-            if prefix_pattern.search(text_to_parse):
+            if self._attachment_prefix_pattern(sender).search(text_to_parse):
                 result['is_attachment'] = True
                 result['text_content'] = ''
                 return result
 
-        dynamic_inline_pattern = self._build_dynamic_inline_reaction_pattern()
-        if dynamic_inline_pattern:
+        dynamic_inline_pattern = self.inline_reaction_pattern
+        if dynamic_inline_pattern and self._ends_with_participant(text_to_parse):
             inline_match = dynamic_inline_pattern.search(text_to_parse)
             if inline_match:
                 result['text_content'] = inline_match.group(1).strip()
@@ -269,11 +240,11 @@ class DfParser:
                 # Extract URLs from text content
                 urls_in_text = self.url_pattern.findall(result['text_content'])
                 if urls_in_text:
-                    result['urls'] = [u[0] for u in urls_in_text]
+                    result['urls'] = urls_in_text
                     result['text_content'] = self.url_pattern.sub('', result['text_content']).strip()
 
                 # Check for information sharing even in messages with reactions
-                if result['text_content']:
+                if info_sharing and result['text_content']:
                     info_result = self._detect_info_sharing(result['text_content'])
                     result['is_info_sharing'] = info_result['is_info_sharing']
                     result['info_sharing_confidence'] = info_result['confidence']
@@ -291,12 +262,12 @@ class DfParser:
 
         urls = self.url_pattern.findall(text_to_parse)
         if urls:
-            result['urls'] = [u[0] for u in urls]
+            result['urls'] = urls
             result['text_content'] = ''
         else:
             result['text_content'] = text_to_parse.strip()
 
-        if result['text_content']:
+        if info_sharing and result['text_content']:
             info_result = self._detect_info_sharing(result['text_content'])
             result['is_info_sharing'] = info_result['is_info_sharing']
             result['info_sharing_confidence'] = info_result['confidence']
@@ -0,0 +1,113 @@
+import re
+from typing import Dict, Tuple
+
+import emoji
+from emoji.unicode_codes import EMOJI_DATA
+
+ZWJ = '\u200d'
+
+NO_EMOJIS: Tuple[str, ...] = ()
+
+
+def _char_class(chars) -> str:
+    """Collapses a set of characters into a regex class made of codepoint ranges."""
+    codepoints = sorted(ord(c) for c in chars)
+    ranges = []
+    start = prev = codepoints[0]
+    for cp in codepoints[1:]:
+        if cp != prev + 1:
+            ranges.append((start, prev))
+            start = cp
+        prev = cp
+    ranges.append((start, prev))
+    parts = [re.escape(chr(a)) if a == b else f"{re.escape(chr(a))}-{re.escape(chr(b))}" for a, b in ranges]
+    return f"[{''.join(parts)}]"
+
+
+def _trie_pattern(node: dict) -> str:
+    """
+    Regex for one node of the emoji trie. Like the emoji library's tokenizer, a match
+    follows the trie as far as the text allows and never falls back to a shorter
+    emoji: a node may only end the match when no child continues it.
+    """
+    children = [char for char in node if char != '']
+    branches = [re.escape(char) + _trie_pattern(node[char]) for char in children]
+    if '' in node and children:
+        branches.append(f"(?!{_char_class(children)})")
+    if not branches:
+        return ''
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+class EmojiMatcher:
+    """
+    Finds every emoji in a message with the same results as `emoji.emoji_list`, using
+    compiled regexes instead of a per-character walk in Python. A codepoint-range
+    prefilter jumps straight to characters an emoji can start with, and the rest of
+    the emoji is matched by a pattern compiled from that character's branch of a trie
+    over the emoji library's data, so no position is tried against thousands of
+    alternatives.
+
+    Text with zero-width joiners goes through the library's tokenizer instead, since
+    it re-splits joined sequences that are not valid emoji in ways a regex can't.
+    """
+
+    def __init__(self):
+        trie: dict = {}
+        for emj in EMOJI_DATA:
+            node = trie
+            for char in emj:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        # Characters such as digits only start an emoji (a keycap) when the right
+        # character follows, so they are not worth a trie match on their own.
+        standalone = [char for char, node in trie.items() if '' in node]
+        prefixes = [char for char, node in trie.items() if '' not in node]
+        followers = {follower for char in prefixes for follower in trie[char]}
+        # Leading with one character class lets the regex engine skip ahead by charset.
+        self._prefilter = re.compile(
+            f"{_char_class(trie.keys())}(?:(?<={_char_class(standalone)})|(?={_char_class(followers)}))"
+        )
+        self._tails = {char: re.compile(_trie_pattern(node)) for char, node in trie.items()}
+        # One shared string per distinct emoji keeps the per-message tuples small.
+        self._interned: Dict[str, str] = {}
+
+    def _scan(self, text: str, candidate: re.Match) -> list:
+        matches = []
+        search, tails = self._prefilter.search, self._tails
+        while candidate:
+            start = candidate.start()
+            tail = tails[text[start]].match(text, start + 1)
+            if tail:
+                matches.append(text[start:tail.end()])
+                candidate = search(text, tail.end())
+            else:
+                candidate = search(text, start + 1)
+        return matches
+
+    def find(self, text: str) -> Tuple[str, ...]:
+        """Emojis in `text`, in order of appearance."""
+        # Every emoji contains a non-ASCII character (keycaps need U+FE0F or U+20E3).
+        if not text or text.isascii():
+            return NO_EMOJIS
+        candidate = self._prefilter.search(text)
+        if candidate is None:
+            return NO_EMOJIS
+        if ZWJ in text:
+            matches = [e['emoji'] for e in emoji.emoji_list(text)]
+        else:
+            matches = self._scan(text, candidate)
+        interned = self._interned
+        found = tuple(interned.setdefault(e, e) for e in matches)
+        return found or NO_EMOJIS
+
+
+_matcher = None
+
+
+def find_emojis(text: str) -> Tuple[str, ...]:
+    global _matcher
+    if _matcher is None:
+        _matcher = EmojiMatcher()
+    return _matcher.find(text)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: entries fall back to pickle without it.
+    pa = pq = None
+
+# Bump whenever load_and_preprocess changes the columns it produces.
+FRAME_CACHE_VERSION = 2
+FINGERPRINT_FIELDS = ('timestamp', 'sender', 'message', 'source')
+# Columns holding a sequence per row; Parquet hands them back as arrays.
+SEQUENCE_COLUMNS = {'emojis': tuple, 'info_sharing_indicators': list}
+_URLS_METADATA_KEY = b'chat_analysis.urls'
+
+
+class FrameCache:
+    """
+    On-disk cache of preprocessed analysis frames keyed by a fingerprint of the
+    filtered messages and everything else preprocessing depends on. Entries are
+    Parquet files when pyarrow is installed and pickles otherwise, written atomically.
+    Entries unused for `max_age_seconds` are removed, and the least recently used ones
+    are evicted once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.suffix = '.frame.parquet' if pq is not None else '.frame.pkl'
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(messages: Iterable[dict], participants: List[str], compact_schema: bool) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{FRAME_CACHE_VERSION}:compact={compact_schema}:".encode())
+        digest.update(json.dumps(participants, ensure_ascii=False).encode('utf-8'))
+        for msg in messages:
+            fields = '\x1f'.join(str(msg.get(field, '')) for field in FINGERPRINT_FIELDS)
+            digest.update(fields.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\x1e')
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, list]]:
+        """Returns (frame, urls) for a cached entry, or None."""
+        path = self._path(key)
+        try:
+            df, urls = self._read_parquet(path) if pq is not None else self._read_pickle(path)
+            os.utime(path)  # Recency for LRU eviction.
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Warning: Could not read analysis frame cache entry {key}: {e}")
+            return None
+        return df, urls
+
+    def put(self, key: str, df: pd.DataFrame, urls: list):
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if pq is not None:
+                self._write_parquet(tmp_path, df, urls)
+            else:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump((df, urls), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Warning: Could not write analysis frame cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.cleanup_stale()
+
+    @staticmethod
+    def _write_parquet(path: str, df: pd.DataFrame, urls: list):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_URLS_METADATA_KEY] = json.dumps(urls, ensure_ascii=False).encode('utf-8')
+        pq.write_table(table.replace_schema_metadata(metadata), path)
+
+    @staticmethod
+    def _read_parquet(path: str) -> Tuple[pd.DataFrame, list]:
+        table = pq.read_table(path)
+        urls = json.loads(table.schema.metadata[_URLS_METADATA_KEY])
+        df = table.to_pandas()
+        # Parquet has no seconds unit, so datetime64[s] columns come back as [ms].
+        for column in json.loads(table.schema.metadata[b'pandas'])['columns']:
+            numpy_type = column['numpy_type']
+            if numpy_type.startswith('datetime64[') and column['name'] in df.columns \
+                    and str(df[column['name']].dtype) != numpy_type:
+                df[column['name']] = df[column['name']].astype(numpy_type)
+        for column, sequence_type in SEQUENCE_COLUMNS.items():
+            if column in df.columns and df[column].dtype == object:
+                values = np.empty(len(df), dtype=object)
+                for i, row_values in enumerate(df[column]):
+                    values[i] = sequence_type(row_values)
+                df[column] = values
+        return df, urls
+
+    @staticmethod
+    def _read_pickle(path: str) -> Tuple[pd.DataFrame, list]:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def cleanup_stale(self):
+        """Removes entries unused for `max_age_seconds`, then evicts by size."""
+        cutoff = time.time() - self.max_age_seconds if self.max_age_seconds > 0 else None
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+                if cutoff is not None and stat.st_mtime < cutoff:
+                    os.remove(entry.path)
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,239 @@
+import re
+from typing import Any, Dict, List, Set
+
+# Keyword groups behind the info-sharing heuristic. Each inner list used to be one
+# `\b(a|b|...)\b` regex; a group counts once per message however often it matches.
+CATEGORY_KEYWORDS = [
+    ('news', [
+        ['has since', 'according to', 'it is reported', 'sources say', 'officials said'],
+        ['government', 'ministry', 'official', 'spokesperson', 'representative'],
+        ['announced', 'declared', 'stated', 'confirmed', 'revealed'],
+        ['policy', 'agreement', 'treaty', 'declaration', 'resolution'],
+        ['meeting', 'conference', 'summit', 'talks', 'negotiations'],
+        ['dispute', 'conflict', 'tension', 'dialogue', 'consultation'],
+    ]),
+    ('announcement', [
+        ['call for papers', 'deadline', 'submission', 'application'],
+        ['pleased to announce', 'we are announcing', 'it is announced'],
+        ['timeline', 'schedule', 'dates', 'registration'],
+        ['conference', 'workshop', 'seminar', 'symposium'],
+        ['partnership', 'collaboration', 'in cooperation with'],
+        ['interested candidates', 'applicants', 'participants'],
+    ]),
+    ('formal', [
+        ['furthermore', 'however', 'nevertheless', 'therefore', 'consequently'],
+        ['in conclusion', 'in summary', 'to summarize', 'in other words'],
+        ['research', 'study', 'analysis', 'findings', 'methodology'],
+        ['implementation', 'framework', 'guidelines', 'provisions'],
+    ]),
+    ('academic', [
+        ['implementation', 'coordination', 'consultations', 'provisions', 'bilateral'],
+        ['digital transformation', 'skills gap', 'practitioners', 'candidates'],
+        ['volume', 'publication', 'manuscript', 'submission', 'proposal'],
+    ]),
+]
+# Case-sensitive institutional names (the acronym rule stays a regex below).
+ORG_NAME_KEYWORDS = [
+    ['Academy', 'University', 'Institute', 'Foundation', 'Organization', 'Association'],
+    ['Cambodia', 'ASEAN', 'China', 'Beijing', 'Ministry', 'Department'],
+]
+PERSONAL_PRONOUNS = ['I', 'me', 'my', 'mine', 'you', 'your', 'yours', 'we', 'us', 'our', 'ours']
+
+# Every indicator detect() can report, in bit order for the compact bitmask encoding.
+INFO_SHARING_INDICATORS = tuple(f"{category}_language" for category, _ in CATEGORY_KEYWORDS) + (
+    'long_quotes', 'formal_dates', 'organizational_names', 'complex_sentences', 'impersonal_tone',
+    'formal_punctuation',
+)
+_INDICATOR_BITS = {name: 1 << bit for bit, name in enumerate(INFO_SHARING_INDICATORS)}
+
+QUOTE_PATTERNS = [
+    re.compile(r'"[^"]{100,}"'),  # Long quoted text (100+ chars)
+    re.compile(r'["""][^"""]{100,}["""]')  # Smart quotes with long content
+]
+DATE_PATTERNS = [
+    re.compile(r'\b\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\b'),
+    re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'),
+    re.compile(r'\b\d{2}:\d{2}\s*(AM|PM|am|pm)\b')
+]
+ACRONYM_PATTERN = re.compile(r'\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b')  # Acronyms like ASEAN, DOC, COC
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+FORMAL_PUNCTUATION_PATTERN = re.compile(r':\s*$')
+DIGIT_PATTERN = re.compile(r'\d')
+
+WORD_PATTERN = re.compile(r'\w+')
+# Non-ASCII letters that re.IGNORECASE matches against ASCII keywords (İ also changes
+# length under lower(), which would shift offsets).
+_CASE_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+
+class InfoSharingScanner:
+    """
+    Scores how much a message reads like forwarded news, announcements or formal
+    writing. All keyword groups are compiled into lookup tables, and each message is
+    scanned once: a single pass over its words records every group that matches and
+    counts personal pronouns. Multi-word keywords are checked only from words that
+    can start one.
+    """
+
+    def __init__(self):
+        # group id -> category name, or None for the org/pronoun groups
+        self._group_categories: List[str] = []
+        self._word_groups: Dict[str, Set[int]] = {}
+        self._phrase_tails: Dict[str, List[tuple]] = {}
+        self._exact_groups: Dict[str, Set[int]] = {}
+
+        for category, groups in CATEGORY_KEYWORDS:
+            for words in groups:
+                group_id = self._new_group(category)
+                for keyword in words:
+                    self._add_keyword(keyword.lower(), group_id)
+        self._org_groups = []
+        for words in ORG_NAME_KEYWORDS:
+            group_id = self._new_group(None)
+            self._org_groups.append(group_id)
+            for keyword in words:
+                self._exact_groups.setdefault(keyword, set()).add(group_id)
+        self._exact_candidates = {k.lower() for k in self._exact_groups}
+        self._pronouns = {p.lower() for p in PERSONAL_PRONOUNS}
+
+    def _new_group(self, category) -> int:
+        self._group_categories.append(category)
+        return len(self._group_categories) - 1
+
+    def _add_keyword(self, keyword: str, group_id: int):
+        first, _, tail = keyword.partition(' ')
+        if tail:
+            self._phrase_tails.setdefault(first, []).append((' ' + tail, group_id))
+        else:
+            self._word_groups.setdefault(first, set()).add(group_id)
+
+    def scan(self, message: str) -> tuple:
+        """Returns (set of matched group ids, number of personal pronouns) in one pass."""
+        hits = set()
+        pronouns = 0
+        folded = message.translate(_CASE_FOLD).lower()
+        word_groups, phrase_tails = self._word_groups, self._phrase_tails
+        for match in WORD_PATTERN.finditer(folded):
+            word = match.group()
+            groups = word_groups.get(word)
+            if groups:
+                hits.update(groups)
+            if word in self._pronouns:
+                pronouns += 1
+            tails = phrase_tails.get(word)
+            if tails:
+                end = match.end()
+                for tail, group_id in tails:
+                    # The tail has to end on a word boundary, as `\b` did.
+                    if folded.startswith(tail, end) and not WORD_PATTERN.match(folded, end + len(tail)):
+                        hits.add(group_id)
+            if word in self._exact_candidates:
+                groups = self._exact_groups.get(message[match.start():match.end()])
+                if groups:
+                    hits.update(groups)
+        return hits, pronouns
+
+    def detect(self, message: str) -> Dict[str, Any]:
+        if not isinstance(message, str) or len(message.strip()) == 0:
+            return {
+                'is_info_sharing': False,
+                'confidence': 0.0,
+                'indicators': [],
+                'category': None
+            }
+
+        message = message.strip()
+        indicators = []
+        confidence_score = 0.0
+        category = None
+
+        hits, pronoun_count = self.scan(message)
+
+        group_id = 0
+        for cat_name, groups in CATEGORY_KEYWORDS:
+            matches = 0
+            for _ in groups:
+                if group_id in hits:
+                    matches += 1
+                    indicators.append(f"{cat_name}_language")
+                group_id += 1
+
+            if matches >= 2:  # Multiple matches in same category
+                confidence_score += 0.3
+                if not category:
+                    category = cat_name
+
+        # Both quote patterns need at least two double quotes around 100+ characters.
+        if len(message) >= 102 and message.count('"') >= 2:
+            for pattern in QUOTE_PATTERNS:
+                if pattern.search(message):
+                    confidence_score += 0.4
+                    indicators.append('long_quotes')
+                    if not category:
+                        category = 'quoted_content'
+
+        if DIGIT_PATTERN.search(message):  # Every date rule needs a digit.
+            date_matches = sum(1 for pattern in DATE_PATTERNS if pattern.search(message))
+            if date_matches >= 2:
+                confidence_score += 0.2
+                indicators.append('formal_dates')
+
+        # Needs all three org rules, so the acronym regex only runs when both name lists hit.
+        if all(g in hits for g in self._org_groups) and ACRONYM_PATTERN.search(message):
+            confidence_score += 0.3
+            indicators.append('organizational_names')
+
+        word_count = len(message.split())
+
+        # Very long messages with formal structure
+        if word_count > 100:
+            sentences = SENTENCE_SPLIT_PATTERN.split(message)
+            valid_sentences = [s for s in sentences if s.strip()]
+            if valid_sentences:
+                avg_sentence_length = sum(len(s.split()) for s in valid_sentences) / len(valid_sentences)
+
+                if avg_sentence_length > 15:  # Long, complex sentences
+                    confidence_score += 0.2
+                    indicators.append('complex_sentences')
+
+        pronoun_ratio = pronoun_count / max(word_count, 1)
+        if pronoun_ratio < 0.02 and word_count > 50:  # Very few personal pronouns in longer text
+            confidence_score += 0.2
+            indicators.append('impersonal_tone')
+
+        if FORMAL_PUNCTUATION_PATTERN.search(message) or message.count(';') >= 2:
+            confidence_score += 0.1
+            indicators.append('formal_punctuation')
+
+        confidence_score = min(confidence_score, 1.0)
+        is_info_sharing = confidence_score >= 0.4
+
+        return {
+            'is_info_sharing': is_info_sharing,
+            'confidence': round(confidence_score, 3),
+            'indicators': list(set(indicators)),  # Remove duplicates
+            'category': category,
+            'word_count': word_count
+        }
+
+
+_scanner = None
+
+
+def detect_info_sharing(message: str) -> Dict[str, Any]:
+    global _scanner
+    if _scanner is None:
+        _scanner = InfoSharingScanner()
+    return _scanner.detect(message)
+
+
+def encode_indicators(indicators: List[str]) -> int:
+    """Packs a list of indicator names into a bitmask over INFO_SHARING_INDICATORS."""
+    mask = 0
+    for name in indicators:
+        mask |= _INDICATOR_BITS[name]
+    return mask
+
+
+def decode_indicators(mask: int) -> List[str]:
+    return [name for name, bit in _INDICATOR_BITS.items() if mask & bit]
@@ -0,0 +1,105 @@
+import hashlib
+import inspect
+import json
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+# Bump when code shared by several modules (utils, lexicon loading) changes their results.
+MODULE_CACHE_VERSION = 1
+
+
+def _canonical(value: Any) -> Any:
+    """A JSON-ready form of a module argument that is the same whenever the argument is."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, re.Pattern):
+        return {'pattern': value.pattern, 'flags': value.flags}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+@lru_cache(maxsize=None)
+def _source_version(module_name: str) -> str:
+    # The whole source file, so edits to helpers next to the module function count too.
+    try:
+        source = inspect.getsource(sys.modules[module_name])
+    except (KeyError, OSError, TypeError):
+        source = module_name
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def module_key(fingerprint: str, module_name: str, func: Callable, args: Dict, report_args: Dict,
+               dependency_keys: List[str]) -> str:
+    """
+    Cache key for one module's result: the filtered-data fingerprint, the module and
+    the source it is defined in, its resolved arguments (lexicons, patterns), the
+    report-wide arguments that shape its input frame, and the keys of the modules it
+    depends on.
+    """
+    payload = json.dumps({
+        'version': MODULE_CACHE_VERSION,
+        'fingerprint': fingerprint,
+        'module': module_name,
+        'code': _source_version(func.__module__),
+        'args': _canonical(args),
+        'report_args': _canonical(report_args),
+        'deps': dependency_keys,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ModuleResultCache:
+    """
+    Serialized analysis module results for one session, keyed by `module_key`. Since
+    keys include the data fingerprint, entries for other filtered data simply never
+    match; they age out least recently used first once there are `max_entries`.
+
+    Hits only refresh recency in memory, so a run served entirely from the cache
+    leaves the stored copy alone; `dirty` is set by `put`, and the refreshed recency
+    is saved along with the next new result.
+    """
+
+    def __init__(self, entries: Optional[Dict] = None, max_entries: int = 64):
+        self.entries = dict(entries or {})
+        self.max_entries = max_entries
+        self.dirty = False
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], max_entries: int) -> 'ModuleResultCache':
+        return cls((data or {}).get('entries'), max_entries)
+
+    def to_dict(self) -> Dict:
+        return {'entries': self.entries, 'count': len(self.entries)}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry['last_used'] = datetime.now().isoformat()
+        return entry['result']
+
+    def put(self, key: str, module_name: str, result: Any):
+        now = datetime.now().isoformat()
+        self.entries[key] = {'module': module_name, 'result': result, 'stored_at': now, 'last_used': now}
+        self.dirty = True
+        self._evict()
+
+    def merge(self, data: Optional[Dict]):
+        """Adds entries from a stored copy that this one lacks, e.g. results saved by an overlapping run."""
+        for key, entry in (data or {}).get('entries', {}).items():
+            self.entries.setdefault(key, entry)
+        self._evict()
+
+    def _evict(self):
+        if len(self.entries) > self.max_entries:
+            by_use = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])
+            for stale_key in by_use[:len(self.entries) - self.max_entries]:
+                del self.entries[stale_key]
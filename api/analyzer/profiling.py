@@ -0,0 +1,111 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: peak RSS is left out there.
+    resource = None
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _max_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT if resource else 0
+
+
+@contextmanager
+def measure(rows: int, trace_memory: bool = False):
+    """
+    Records the cost of the enclosed block into the yielded dict: wall and CPU
+    seconds (CPU time of the calling thread only, so concurrent modules don't count
+    each other), the input row count, how far the process's peak RSS grew, and with
+    `trace_memory` the peak Python allocations made during the block. Allocations are
+    only recorded while tracemalloc is already tracing (see PerformanceRecorder.tracing);
+    it is process-wide, so the peak is only attributable when nothing else runs at the
+    same time.
+    """
+    metrics = {'rows': int(rows)}
+    rss_before = _max_rss()
+    trace_memory = trace_memory and tracemalloc.is_tracing()
+    if trace_memory:
+        allocated_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield metrics
+    finally:
+        metrics['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+        metrics['cpu_seconds'] = round(time.thread_time() - cpu_start, 4)
+        if trace_memory and tracemalloc.is_tracing():
+            metrics['peak_allocated_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - allocated_before)
+        if resource:
+            metrics['max_rss_growth_bytes'] = max(0, _max_rss() - rss_before)
+
+
+def run_measured(module_name: str, func: Callable, df, kwargs: Dict, trace_memory: bool = False) -> Tuple[Dict, Dict]:
+    """
+    Runs one analysis module and returns (result, metrics). A module that raises
+    gets an error result instead, so its cost is still reported.
+    """
+    with measure(len(df), trace_memory) as metrics:
+        try:
+            result = func(df, **kwargs)
+        except Exception as e:
+            error_msg = f"Error in module '{module_name}': {type(e).__name__} - {e}"
+            print(error_msg)
+            result = {"error": error_msg}
+    return result, metrics
+
+
+class PerformanceRecorder:
+    """Collects `measure` results for preprocessing stages and analysis modules."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict] = {}
+        self.modules: Dict[str, Dict] = {}
+
+    @contextmanager
+    def tracing(self):
+        """
+        Keeps tracemalloc on for one analysis run when memory tracing is enabled. It is
+        stopped afterwards only if it was started here, so tracing never outlives the run.
+        """
+        started = self.trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str, rows: int):
+        with measure(rows, self.trace_memory) as metrics:
+            yield metrics
+        self.stages[name] = metrics
+
+    def report(self) -> Dict:
+        return {
+            'preprocessing': self.stages,
+            'modules': self.modules,
+            'memory_tracing': self.trace_memory,
+            'peak_rss_bytes': _max_rss() or None,
+        }
+
+    def summary_lines(self):
+        """One line per stage and module, slowest first."""
+        entries = [('stage', name, m) for name, m in self.stages.items()]
+        entries += [('module', name, m) for name, m in self.modules.items()]
+        for kind, name, m in sorted(entries, key=lambda entry: entry[2]['wall_seconds'], reverse=True):
+            line = f"{kind} {name}: {m['wall_seconds']:.3f}s wall, {m['cpu_seconds']:.3f}s CPU, {m['rows']} rows"
+            if 'peak_allocated_bytes' in m:
+                line += f", {m['peak_allocated_bytes'] / 1024 / 1024:.1f} MB allocated"
+            if 'max_rss_growth_bytes' in m:
+                line += f", +{m['max_rss_growth_bytes'] / 1024 / 1024:.1f} MB peak RSS"
+            yield line
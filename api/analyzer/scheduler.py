@@ -0,0 +1,116 @@
+import multiprocessing
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .profiling import run_measured
+
+PROCESS = 'process'
+# Below this many rows, spawning the process pool costs more than the modules it would run.
+PROCESS_POOL_MIN_ROWS = 20_000
+
+# The analysis frame handed to each process pool worker once, by the pool initializer.
+_worker_frame = None
+
+
+def _init_worker(frame: pd.DataFrame, trace_memory: bool):
+    global _worker_frame
+    _worker_frame = frame
+    if trace_memory:  # Pool workers exit with the run, which ends their tracing too.
+        tracemalloc.start()
+
+
+def _run_in_worker(module_name: str, func: Callable, kwargs: dict, trace_memory: bool):
+    return run_measured(module_name, func, _worker_frame, kwargs, trace_memory)
+
+
+class ModuleScheduler:
+    """
+    Runs analysis modules as a DAG built from their registry `deps`: a module is
+    submitted as soon as everything it depends on has finished, so independent modules
+    run side by side. Modules only read the frame, so threads share it as is. Entries
+    marked `'executor': 'process'` (the CPU-bound text scans) go to a process pool
+    instead; each pool worker receives one copy of the frame, cut down to the columns
+    those modules read, when it starts.
+
+    All bookkeeping, including progress updates, happens on the calling thread. Every
+    module is measured where it runs (see profiling.measure); with `trace_memory`,
+    threaded modules run one at a time so their allocation peaks don't mix.
+    """
+
+    def __init__(self, registry: Dict, max_workers: int = 1, process_workers: int = 0, trace_memory: bool = False):
+        self.registry = registry
+        self.max_workers = 1 if trace_memory else max(1, max_workers)
+        self.process_workers = process_workers
+        self.trace_memory = trace_memory
+
+    def run(self, run_queue: List[str], df: pd.DataFrame, process_columns: List[str],
+            on_progress: Callable[[int, int, str], None], precomputed: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+        """
+        Runs every module in `run_queue`, which lists dependencies before dependents,
+        and returns their results and their metrics, both in queue order. Modules in
+        `precomputed` are not run; their results are used as they are, dependents
+        included, and they have no metrics. `on_progress(done, total, step)` is called
+        as modules are started and finished.
+        """
+        results = {name: result for name, result in (precomputed or {}).items() if name in run_queue}
+        metrics = {}
+        total = len(run_queue)
+        waiting = [name for name in run_queue if name not in results]
+        process_modules = sum(self.registry[name].get('executor') == PROCESS for name in waiting)
+        use_processes = self.process_workers > 0 and process_modules > 0 and len(df) >= PROCESS_POOL_MIN_ROWS
+
+        threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+        processes = None
+        if use_processes:
+            # 'spawn' keeps the children clear of the web server's threads and DB pool.
+            # No more workers than there are modules for them, since each one pays for its own start-up.
+            processes = ProcessPoolExecutor(max_workers=min(self.process_workers, process_modules),
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(df[process_columns], self.trace_memory))
+        running = {}
+        try:
+            while waiting or running:
+                for module_name in [name for name in waiting if self._is_ready(name, run_queue, results)]:
+                    waiting.remove(module_name)
+                    module_info = self.registry[module_name]
+                    kwargs = self._module_kwargs(module_info, results)
+                    on_progress(len(results), total, f"Running {module_name}")
+                    if processes is not None and module_info.get('executor') == PROCESS:
+                        future = processes.submit(_run_in_worker, module_name, module_info['func'], kwargs,
+                                                  self.trace_memory)
+                    else:
+                        future = threads.submit(run_measured, module_name, module_info['func'], df, kwargs,
+                                                self.trace_memory)
+                    running[future] = module_name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    module_name = running.pop(future)
+                    try:
+                        results[module_name], metrics[module_name] = future.result()
+                    except Exception as e:  # The module never ran, e.g. the process pool broke.
+                        error_msg = f"Error in module '{module_name}': {type(e).__name__} - {e}"
+                        print(error_msg)
+                        results[module_name] = {"error": error_msg}
+                    on_progress(len(results), total, f"Finished {module_name}")
+        finally:
+            threads.shutdown(wait=True, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        return ({name: results[name] for name in run_queue},
+                {name: metrics[name] for name in run_queue if name in metrics})
+
+    def _is_ready(self, module_name: str, run_queue: List[str], results: Dict) -> bool:
+        return all(dep in results for dep in self.registry[module_name].get('deps', []) if dep in run_queue)
+
+    @staticmethod
+    def _module_kwargs(module_info: Dict, results: Dict) -> Dict:
+        # Static arguments, plus each dependency's result as "<dependency>_data".
+        kwargs = module_info.get('args', {}).copy()
+        for dependency_key in module_info.get('deps', []):
+            kwargs[f"{dependency_key}_data"] = results.get(dependency_key, {})
+        return kwargs
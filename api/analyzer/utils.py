@@ -1,3 +1,5 @@
+import sys
+
 import numpy as np
 import pandas as pd
 from datetime import datetime, date
@@ -27,4 +29,40 @@ class AnalysisUtils:
             return [AnalysisUtils.convert_to_serializable(i) for i in obj]
         if pd.isna(obj):
             return None
-        return obj
\ No newline at end of file
+        return obj
+
+    @staticmethod
+    def frame_memory_report(df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Bytes held by each column of an analysis frame. Unlike memory_usage(deep=True),
+        a Python object referenced from several cells or columns (text_content usually
+        shares its strings with message) is counted once, by the first column that
+        holds it.
+        """
+        seen = set()
+        columns = {}
+        for name in df.columns:
+            series = df[name]
+            if series.dtype == object or getattr(series.dtype, 'storage', None) == 'python':
+                size = series.memory_usage(index=False, deep=False)
+                for value in series.array:
+                    if id(value) in seen:
+                        continue
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+                    if isinstance(value, (list, tuple)):
+                        for item in value:
+                            if id(item) not in seen:
+                                seen.add(id(item))
+                                size += sys.getsizeof(item)
+            else:
+                size = series.memory_usage(index=False, deep=True)
+            columns[name] = {'dtype': str(series.dtype), 'bytes': int(size)}
+
+        total = sum(c['bytes'] for c in columns.values()) + int(df.index.memory_usage())
+        return {
+            'rows': len(df),
+            'total_bytes': total,
+            'bytes_per_row': round(total / len(df), 1) if len(df) else 0,
+            'columns': columns,
+        }
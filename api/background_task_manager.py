@@ -64,14 +64,20 @@ class BackgroundTaskManager:
         cleanup_thread = threading.Thread(target=self._cleanup_old_tasks, daemon=True)
         cleanup_thread.start()
 
-    def submit_task(self, session_id: str, func: Callable, *args, **kwargs) -> str:
+    def submit_task(self, session_id: str, func: Callable, *args, on_skip: Optional[Callable] = None,
+                    **kwargs) -> str:
+        """
+        Queues `func(*args, **kwargs)`. `on_skip` is called instead if the task never
+        runs because it was cancelled or cleared while still pending, so resources
+        handed over to the task (such as a spooled upload) are still released.
+        """
         task_id = str(uuid.uuid4())
         task_name = func.__name__.replace('_', ' ').title()
         with self.tasks_lock:
             self.tasks[task_id] = TaskResult(task_id=task_id, status=TaskStatus.PENDING, name=task_name)
             self.session_tasks.setdefault(session_id, set()).add(task_id)
 
-        self.task_queue.put((task_id, func, args, kwargs))
+        self.task_queue.put((task_id, func, args, kwargs, on_skip))
         log(f"Task {task_id} ({task_name}) submitted for session {session_id}")
         return task_id
 
@@ -87,19 +93,26 @@ class BackgroundTaskManager:
     def _worker(self):
         while self.running:
             try:
-                task_id, func, args, kwargs = self.task_queue.get(timeout=1)
+                task_id, func, args, kwargs, on_skip = self.task_queue.get(timeout=1)
             except Empty:
                 continue
 
             with self.tasks_lock:
                 task = self.tasks.get(task_id)
-                if not task or task.status != TaskStatus.PENDING:
-                    log(f"Skipping task {task_id} as its status is not PENDING.")
-                    self.task_queue.task_done()
-                    continue
-                task.status = TaskStatus.RUNNING
-                task.started_at = datetime.now()
-                task.stage = "Starting"
+                skipped = not task or task.status != TaskStatus.PENDING
+                if not skipped:
+                    task.status = TaskStatus.RUNNING
+                    task.started_at = datetime.now()
+                    task.stage = "Starting"
+            if skipped:
+                log(f"Skipping task {task_id} as its status is not PENDING.")
+                if on_skip:
+                    try:
+                        on_skip()
+                    except Exception as e:
+                        log(f"Cleanup for skipped task {task_id} failed: {e}")
+                self.task_queue.task_done()
+                continue
 
             log(f"Worker {threading.current_thread().name} is processing task {task_id}.")
 
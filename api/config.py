@@ -9,3 +9,34 @@ class Config:
     TARGET_FORMAT = '%Y-%m-%d %H:%M:%S'
     REDIS_URL = os.getenv('REDIS_URL')
     DATABASE_URL = os.getenv('DATABASE_URL')
+
+    # Process pool size for parsing ZIP members in parallel; 1 disables the pool.
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', os.cpu_count() or 1))
+    # A lone HTML export at least this big is cut into shards and parsed by the same pool.
+    SHARD_MIN_BYTES = int(os.getenv('SHARD_MIN_BYTES', 32 * 1024 * 1024))
+    # Appended uploads are kept as separate sorted runs until there are this many.
+    MAX_PROCESSED_RUNS = int(os.getenv('MAX_PROCESSED_RUNS', 4))
+    # Extracted messages cached by file content hash; a size of 0 disables the cache.
+    PARSE_CACHE_FOLDER = os.getenv('PARSE_CACHE_FOLDER', os.path.join(UPLOAD_FOLDER, "parse_cache"))
+    PARSE_CACHE_MAX_BYTES = int(os.getenv('PARSE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+    # Analyze with the memory-compact DataFrame schema (categoricals, small ints, indicator bitmasks).
+    COMPACT_ANALYSIS_SCHEMA = os.getenv('COMPACT_ANALYSIS_SCHEMA', 'true').lower() in ('1', 'true', 'yes')
+    # Preprocessed analysis frames cached by filtered-data fingerprint; a size of 0 disables the cache.
+    FRAME_CACHE_FOLDER = os.getenv('FRAME_CACHE_FOLDER', os.path.join(UPLOAD_FOLDER, "frame_cache"))
+    FRAME_CACHE_MAX_BYTES = int(os.getenv('FRAME_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+    # Parse and frame cache entries unused for this long are removed, in line with the 24-hour session data cleanup.
+    CACHE_MAX_AGE_SECONDS = int(os.getenv('CACHE_MAX_AGE_SECONDS', 24 * 60 * 60))
+    # Threads running independent analysis modules side by side; 1 runs them one at a time.
+    ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 1))
+    # Process pool for the CPU-heavy modules (topics, thematic scans); 0 keeps them on threads.
+    ANALYSIS_PROCESS_WORKERS = int(os.getenv('ANALYSIS_PROCESS_WORKERS', os.cpu_count() or 1))
+    # Record per-module Python allocation peaks with tracemalloc. Slows analysis down and runs threaded modules one at a time.
+    ANALYSIS_TRACE_MEMORY = os.getenv('ANALYSIS_TRACE_MEMORY', 'false').lower() in ('1', 'true', 'yes')
+    # Analysis module results kept per session for reuse by later /analyze runs; 0 disables the cache.
+    MODULE_CACHE_MAX_ENTRIES = int(os.getenv('MODULE_CACHE_MAX_ENTRIES', 64))
+
+    # Resumable uploads: each chunk request still has to fit in MAX_CONTENT_LENGTH.
+    CHUNKED_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, "chunks")
+    MAX_CHUNKED_UPLOAD_SIZE = int(os.getenv('MAX_CHUNKED_UPLOAD_SIZE', 10 * 1024 * 1024 * 1024))
+    CHUNKED_UPLOAD_TTL_SECONDS = int(os.getenv('CHUNKED_UPLOAD_TTL_SECONDS', 24 * 60 * 60))
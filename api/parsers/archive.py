@@ -0,0 +1,64 @@
+import gzip
+import io
+import os
+import tarfile
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst uploads.
+    zstandard = None
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ZSTD_TAR_SUFFIXES = ('.tar.zst', '.tzst')
+STREAM_ARCHIVE_SUFFIXES = TAR_SUFFIXES + ZSTD_TAR_SUFFIXES + ('.gz', '.zst')
+
+
+def is_stream_archive(filename: str) -> bool:
+    """True for tar, gzip and zstd uploads, which are decompressed on the fly rather than opened as a ZipFile."""
+    return filename.lower().endswith(STREAM_ARCHIVE_SUFFIXES)
+
+
+@contextmanager
+def _zstd_stream(raw):
+    if zstandard is None:
+        raise ValueError("Zstandard uploads need the optional 'zstandard' package.")
+    with zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+        yield io.BufferedReader(reader)
+
+
+def _iter_tar_members(tar: tarfile.TarFile, valid_extensions: tuple):
+    for member in tar:
+        name = member.name
+        if not member.isfile() or name.startswith('__MACOSX/') or not name.lower().endswith(valid_extensions):
+            continue
+        file_obj = tar.extractfile(member)
+        if file_obj is not None:
+            yield name, file_obj, False
+
+
+def iter_stream_archive(raw, filename: str, valid_extensions: tuple):
+    """
+    Yields (member_name, file_obj, rewindable) for every export file in a tar, gzip or
+    zstd upload read from the binary stream `raw`. Everything is decompressed
+    incrementally and nothing is extracted to disk; tar members are only readable
+    until the next one is requested, and only gzip members can seek back to the start.
+    """
+    lower = filename.lower()
+    if lower.endswith(ZSTD_TAR_SUFFIXES):
+        with _zstd_stream(raw) as stream, tarfile.open(fileobj=stream, mode='r|') as tar:
+            yield from _iter_tar_members(tar, valid_extensions)
+    elif lower.endswith(TAR_SUFFIXES):
+        with tarfile.open(fileobj=raw, mode='r|*') as tar:
+            yield from _iter_tar_members(tar, valid_extensions)
+    elif lower.endswith('.gz'):
+        inner_name = os.path.basename(filename)[:-len('.gz')]
+        if inner_name.lower().endswith(valid_extensions):
+            # Wrapped so callers can tag it with a filename (GzipFile.filename is read-only).
+            with gzip.GzipFile(fileobj=raw, mode='rb') as gz, io.BufferedReader(gz) as stream:
+                yield inner_name, stream, True
+    elif lower.endswith('.zst'):
+        inner_name = os.path.basename(filename)[:-len('.zst')]
+        if inner_name.lower().endswith(valid_extensions):
+            with _zstd_stream(raw) as stream:
+                yield inner_name, stream, False
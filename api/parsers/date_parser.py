@@ -1,5 +1,40 @@
 import re
 from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+DATETIME_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M',
+    '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M', '%m/%d/%Y %I:%M %p', '%m/%d/%y %H:%M:%S', '%m/%d/%y %I:%M:%S %p',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %I:%M:%S %p', '%d/%m/%Y %H:%M',
+    '%b %d, %Y, %I:%M %p', '%b %d, %Y %I:%M:%S %p', '%b %d, %Y  %I:%M:%S %p',
+    '%B %d, %Y, %I:%M %p', '%B %d, %Y %I:%M:%S %p', '%b %d, %Y, %H:%M:%S',
+    '%B %d, %Y, %H:%M:%S', '%b %d, %Y %H:%M:%S', '%B %d, %Y %H:%M:%S',
+    '%b %d, %Y', '%B %d, %Y', '%d-%m-%Y', '%m-%d-%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y'
+]
+
+# Pseudo-format recorded when a timestamp was recognised by parse_khmer_date.
+KHMER_FORMAT = 'khmer'
+
+
+def _layout(fmt: str) -> str:
+    # Formats that differ only in day/month order (or month name length) can read the same string.
+    return re.sub(r'%[dmbB]', '%_', fmt)
+
+
+# For each format, the other formats that could also match a string it matches, split
+# into those earlier in DATETIME_FORMATS (which win such a string) and all of them.
+_EARLIER_RIVALS = {
+    fmt: [other for other in DATETIME_FORMATS[:i] if _layout(other) == _layout(fmt)]
+    for i, fmt in enumerate(DATETIME_FORMATS)
+}
+_RIVALS = {
+    fmt: [other for other in DATETIME_FORMATS if other != fmt and _layout(other) == _layout(fmt)]
+    for fmt in DATETIME_FORMATS
+}
+
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
 
 def clean_timestamp(ts):
     if not ts:
@@ -12,27 +47,42 @@ def clean_timestamp(ts):
     ts = ' '.join(ts.split())
     return ts
 
+KHMER_MONTHS = {
+    'មករា': 1, 'កុម្ភៈ': 2, 'មីនា': 3, 'មេសា': 4,
+    'ឧសភា': 5, 'មិថុនា': 6, 'កក្កដា': 7, 'សីហា': 8,
+    'កញ្ញា': 9, 'តុលា': 10, 'វិច្ឆិកា': 11, 'ធ្នូ': 12
+}
+KHMER_PM = 'ល្ងាច'
+KHMER_AM = 'ព្រឹក'
+
+# One pass finds the month name and any AM/PM marker.
+_KHMER_TOKEN_PATTERN = re.compile(
+    '(?P<month>' + '|'.join(re.escape(m) for m in sorted(KHMER_MONTHS, key=len, reverse=True)) + ')'
+    f'|(?P<pm>{KHMER_PM})|(?P<am>{KHMER_AM})'
+)
+_KHMER_DIGITS = str.maketrans('០១២៣៤៥៦៧៨៩', '0123456789')
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
 def parse_khmer_date(ts):
-    if not ts:
+    if not ts or ts.isascii():
+        # Every Khmer date contains Khmer script; plain ASCII timestamps bail out here.
         return None
 
-    khmer_months = {
-        'មករា': 1, 'កុម្ភៈ': 2, 'មីនា': 3, 'មេសា': 4,
-        'ឧសភា': 5, 'មិថុនា': 6, 'កក្កដា': 7, 'សីហា': 8,
-        'កញ្ញា': 9, 'តុលា': 10, 'វិច្ឆិកា': 11, 'ធ្នូ': 12
-    }
     try:
-        has_khmer_month = any(month in ts for month in khmer_months.keys())
-        if not has_khmer_month:
-            return None
         month_num = None
-        for kh_month, num in khmer_months.items():
-            if kh_month in ts:
-                month_num = num
-                break
+        is_pm = is_am = False
+        for match in _KHMER_TOKEN_PATTERN.finditer(ts):
+            kind = match.lastgroup
+            if kind == 'month':
+                month_num = month_num or KHMER_MONTHS[match.group()]
+            elif kind == 'pm':
+                is_pm = True
+            else:
+                is_am = True
         if not month_num:
             return None
-        numbers = re.findall(r'\d+', ts)
+        numbers = _NUMBER_PATTERN.findall(ts.translate(_KHMER_DIGITS))
         if len(numbers) >= 5:
             day, year, hour, minute, second = map(int, numbers[:5])
         elif len(numbers) >= 4:
@@ -40,9 +90,9 @@ def parse_khmer_date(ts):
             second = 0
         else:
             return None
-        if 'ល្ងាច' in ts and hour < 12:
+        if is_pm and hour < 12:
             hour += 12
-        elif 'ព្រឹក' in ts and hour == 12:
+        elif is_am and hour == 12:
             hour = 0
         return datetime(year, month_num, day, hour, minute, second)
     except Exception as e:
@@ -52,33 +102,36 @@ def parse_datetime_comprehensive(ts):
     if not ts:
         return None
 
-    ts = clean_timestamp(ts)
+    return _parse_cleaned_timestamp(clean_timestamp(ts))[0]
+
+
+def _parse_cleaned_timestamp(ts) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    Parses an already cleaned timestamp and returns (datetime, format). The format is
+    the strptime pattern (or KHMER_FORMAT) that matched, or None when only the loose
+    fallbacks succeeded and there is nothing worth learning.
+    """
+    if not ts:
+        return None, None
+
     khmer_date = parse_khmer_date(ts)
     if khmer_date:
-        return khmer_date
-
-    formats = [
-        '%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S.%fZ',
-        '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M',
-        '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %I:%M:%S %p',
-        '%m/%d/%Y %H:%M', '%m/%d/%Y %I:%M %p', '%m/%d/%y %H:%M:%S', '%m/%d/%y %I:%M:%S %p',
-        '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %I:%M:%S %p', '%d/%m/%Y %H:%M',
-        '%b %d, %Y, %I:%M %p', '%b %d, %Y %I:%M:%S %p', '%b %d, %Y  %I:%M:%S %p',
-        '%B %d, %Y, %I:%M %p', '%B %d, %Y %I:%M:%S %p', '%b %d, %Y, %H:%M:%S',
-        '%B %d, %Y, %H:%M:%S', '%b %d, %Y %H:%M:%S', '%B %d, %Y %H:%M:%S',
-        '%b %d, %Y', '%B %d, %Y', '%d-%m-%Y', '%m-%d-%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y'
-    ]
-
-    for fmt in formats:
+        return khmer_date, KHMER_FORMAT
+
+    for fmt in DATETIME_FORMATS:
         try:
             dt = datetime.strptime(ts, fmt)
             # Basic validation to avoid default 1900 year for incomplete formats
             if dt.year == 1900 and not any(c.isdigit() for c in ts):
                 continue
-            return dt
+            return dt, fmt
         except ValueError:
             continue
 
+    return _parse_loose_timestamp(ts), None
+
+
+def _parse_loose_timestamp(ts) -> Optional[datetime]:
     # Attempt to parse with a flexible regex for common patterns if direct parsing fails
     try:
         # Example: "DD Mon YYYY HH:MM:SS" or "Mon DD, YYYY HH:MM:SS AM/PM"
@@ -124,4 +177,92 @@ def parse_datetime_comprehensive(ts):
                             return datetime(year, month, day, hour, minute, second)
     except Exception:
         pass
-    return None
\ No newline at end of file
+    return None
+
+
+def wall_clock_epoch(dt: datetime) -> int:
+    """
+    Whole seconds since 1970-01-01 of the datetime's wall-clock fields, ignoring any
+    tzinfo and sub-second part, which is exactly what a TARGET_FORMAT string keeps.
+    """
+    return (dt.toordinal() - _EPOCH_ORDINAL) * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+class TimestampParser:
+    """
+    Stateful front end to parse_datetime_comprehensive for parsing a whole export.
+
+    Nearly every message from one source shares a timestamp format, so the parser
+    remembers a format per source and tries it first, before cleaning or the full
+    format scan. Raw strings are also memoised per source in a bounded dict, since
+    exports repeat the same timestamp for bursts of messages.
+
+    Results always match parse_datetime_comprehensive, whatever order messages come
+    in: the learned format is only trusted when no format ahead of it in
+    DATETIME_FORMATS also reads the string (05/06/2023 10:00 stays May 6 even after
+    13/05/2023 taught the parser day-first), and a format is only learned from a
+    string no other format of the same layout could read.
+    """
+
+    def __init__(self, memo_size: int = 100_000):
+        self.memo_size = memo_size
+        # Keyed by (source, raw string): the same string may read differently in another source.
+        self._memo: Dict[Tuple[Optional[str], str], Optional[datetime]] = {}
+        self._learned_formats: Dict[Optional[str], str] = {}
+        self.stats = {'parsed': 0, 'memo_hits': 0, 'format_hits': 0, 'full_scans': 0, 'failures': 0}
+
+    def parse(self, ts, source: Optional[str] = None) -> Optional[datetime]:
+        if not ts:
+            return None
+
+        self.stats['parsed'] += 1
+        memo_key = (source, ts)
+        if memo_key in self._memo:
+            self.stats['memo_hits'] += 1
+            return self._memo[memo_key]
+
+        dt = None
+        fmt = self._learned_formats.get(source)
+        if fmt:
+            candidate = ts
+            dt = self._try_format(ts, fmt)
+            if dt is None:
+                candidate = clean_timestamp(ts)
+                if candidate != ts:
+                    dt = self._try_format(candidate, fmt)
+            if dt is not None and any(self._try_format(candidate, rival) for rival in _EARLIER_RIVALS.get(fmt, ())):
+                dt = None  # Ambiguous: the full scan applies the usual precedence.
+            if dt is not None:
+                self.stats['format_hits'] += 1
+
+        if dt is None:
+            self.stats['full_scans'] += 1
+            cleaned = clean_timestamp(ts)
+            dt, fmt = _parse_cleaned_timestamp(cleaned)
+            if fmt and not any(self._try_format(cleaned, rival) for rival in _RIVALS.get(fmt, ())):
+                self._learned_formats[source] = fmt
+            if dt is None:
+                self.stats['failures'] += 1
+
+        if len(self._memo) >= self.memo_size:
+            del self._memo[next(iter(self._memo))]
+        self._memo[memo_key] = dt
+        return dt
+
+    @staticmethod
+    def _try_format(ts, fmt) -> Optional[datetime]:
+        if fmt == KHMER_FORMAT:
+            return parse_khmer_date(ts)
+        try:
+            return datetime.strptime(ts, fmt)
+        except ValueError:
+            return None
+
+    def hit_rates(self) -> dict:
+        parsed = self.stats['parsed'] or 1
+        return {
+            **self.stats,
+            'memo_hit_rate': round(self.stats['memo_hits'] / parsed, 4),
+            'format_hit_rate': round(self.stats['format_hits'] / parsed, 4),
+            'learned_formats': {str(k): v for k, v in self._learned_formats.items()},
+        }
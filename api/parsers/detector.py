@@ -1,28 +1,55 @@
 import re
-from selectolax.parser import HTMLParser
+from typing import Optional
 
-class PlatformDetector:
-    @staticmethod
-    def detect_platform(tree: HTMLParser) -> str:
-
-        for script in tree.css('script'):
-            if re.search(r"let\s+messages\s*=\s*\[", script.text(strip=False)):
-                return 'discord_json_embed'
-
-        if tree.css_first('div.iMessage'):
-            return 'imessage'
-
-        if tree.css_first('div.history') and tree.css_first('div.message'):
-            return 'telegram'
 
-        if tree.css_first('div.pre--content') or tree.css_first('div.chat-msg'):
-            return 'discord'
+def _div_class_marker(*class_names: str) -> re.Pattern:
+    """Matches the opening tag of a <div> whose class attribute holds all of `class_names`."""
+    lookaheads = b''.join(
+        rb'(?=[^"\'>]*(?<![\w-])' + re.escape(name.encode()) + rb'(?![\w-]))' for name in class_names
+    )
+    return re.compile(rb'<div\b[^>]*?\sclass\s*=\s*["\']?' + lookaheads)
 
-        if tree.css_first('div._2pim'):
-            return 'instagram'
-
-        if tree.css_first('div._2ph_'):
-            return 'facebook'
-
-        return 'unknown'
 
+class PlatformDetector:
+    # How much of a file sniff_platform looks at before falling back to a full marker scan.
+    SNIFF_BYTES = 64 * 1024
+
+    # The embedded message array only counts inside a <script> element; chat text is
+    # HTML-escaped, so a message that quotes it can't open one.
+    _DISCORD_EMBED_MARKER = re.compile(
+        rb"<script\b[^>]*>(?:(?!</script).)*?let\s+messages\s*=\s*\[", re.DOTALL | re.IGNORECASE
+    )
+
+    # Checked in order after the Discord embed; a platform matches when any of its
+    # marker groups is fully present.
+    _MARKERS = [
+        ('imessage', [[_div_class_marker('iMessage')]]),
+        ('telegram', [[_div_class_marker('history'), _div_class_marker('message')]]),
+        ('discord', [[_div_class_marker('pre--content')], [_div_class_marker('chat-msg')]]),
+        ('instagram', [[_div_class_marker('_2pim')]]),
+        ('facebook', [[_div_class_marker('_2ph_')]]),
+    ]
+
+    @classmethod
+    def sniff_platform(cls, head: bytes) -> Optional[str]:
+        """
+        Classifies a file from the first SNIFF_BYTES of its raw bytes, without building a
+        DOM. Returns None when the prefix is inconclusive.
+        """
+        return cls._match_markers(head[:cls.SNIFF_BYTES])
+
+    @classmethod
+    def scan_platform(cls, data: bytes) -> str:
+        """Marker scan over the whole raw file; the fallback when sniffing is inconclusive."""
+        return cls._match_markers(data) or 'unknown'
+
+    @classmethod
+    def _match_markers(cls, data: bytes) -> Optional[str]:
+        if cls._DISCORD_EMBED_MARKER.search(data):
+            return 'discord_json_embed'
+
+        for platform, marker_groups in cls._MARKERS:
+            if any(all(marker.search(data) for marker in group) for group in marker_groups):
+                return platform
+
+        return None
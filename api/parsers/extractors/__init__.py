@@ -1,10 +1,10 @@
 # chat_parser/extractors/__init__.py
 
-from .telegram import extract_telegram
+from .telegram import extract_telegram, stream_telegram
 from .facebook import extract_facebook
 from .instagram import extract_instagram
 from .imessage import extract_imessage
-from .discord import extract_discord_html, extract_discord_json
+from .discord import extract_discord_html, extract_discord_json, stream_discord_json
 
 EXTRACTOR_MAP = {
     'telegram': extract_telegram,
@@ -13,4 +13,10 @@ EXTRACTOR_MAP = {
     'imessage': extract_imessage,
     'discord': extract_discord_html,
     'discord_json_embed': extract_discord_json
-}
\ No newline at end of file
+}
+
+# Extractors that consume the raw file incrementally instead of a prebuilt tree.
+STREAMING_EXTRACTOR_MAP = {
+    'telegram': stream_telegram,
+    'discord_json_embed': stream_discord_json
+}
@@ -2,48 +2,97 @@ import re
 from selectolax.parser import HTMLParser
 import json
 
-def extract_discord_json(tree: HTMLParser):
+MESSAGES_ARRAY_START = re.compile(r"let\s+messages\s*=\s*\[")
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+_json_decoder = json.JSONDecoder()
+# Opening tag of every message container in HTML exports ("chat-msg-text" etc. do not match).
+CHAT_MSG_BOUNDARY = re.compile(r'<div class="chat-msg[ "]')
+
+
+def iter_embedded_messages(text: str):
+    """
+    Yields the objects of an embedded `let messages = [...]` array one at a time. The
+    array start is located once and each element is decoded in place with raw_decode,
+    so the full list is never materialised. Raises json.JSONDecodeError on bad input.
+    """
+    match = MESSAGES_ARRAY_START.search(text)
+    if not match:
+        return
+    pos = match.end()
+    end = len(text)
+    while True:
+        pos = _ARRAY_SEPARATORS.match(text, pos).end()
+        if pos >= end:
+            raise json.JSONDecodeError("Unterminated messages array", text, pos)
+        if text[pos] == ']':
+            return
+        obj, pos = _json_decoder.raw_decode(text, pos)
+        yield obj
+
+
+def _normalize_discord_message(msg):
+    if not isinstance(msg, dict):
+        return None
+    author_info = msg.get('author', {})
+    sender = author_info.get('username')
+    timestamp = msg.get('timestamp')
+    text = msg.get('content')
+
+    if not text:
+        if 'sticker_items' in msg and msg['sticker_items']:
+            sticker_name = msg['sticker_items'][0].get('name')
+            if sticker_name:
+                text = f"Sticker: '{sticker_name}'"
+        elif 'embeds' in msg and msg['embeds']:
+            embed_desc = msg['embeds'][0].get('description')
+            if embed_desc:
+                text = embed_desc
+
+    if sender and text:
+        return {
+            'source': 'Discord',
+            'timestamp': timestamp,
+            'sender': sender,
+            'message': text.strip()
+        }
+    return None
+
+
+def iter_discord_json(text: str):
+    """Yields normalised messages from the embedded array in `text`."""
+    for raw_msg in iter_embedded_messages(text):
+        msg = _normalize_discord_message(raw_msg)
+        if msg:
+            yield msg
+
+
+def _collect_discord_json(text: str) -> list:
     msgs = []
+    try:
+        for msg in iter_discord_json(text):
+            msgs.append(msg)
+    except json.JSONDecodeError:
+        print(f"Warning: Failed to decode the 'let messages' array after {len(msgs)} messages.")
+    return msgs
+
 
+def extract_discord_json(tree: HTMLParser):
     for script in tree.css('script'):
         script_text = script.text(strip=False)
-        match = re.search(r"let\s+messages\s*=\s*(\[.*?\])\s*;", script_text, re.DOTALL)
-
-        if match:
-            json_string = match.group(1)
-            try:
-                data = json.loads(json_string)
-
-                for msg in data:
-                    author_info = msg.get('author', {})
-                    sender = author_info.get('username')
-                    timestamp = msg.get('timestamp')
-                    text = msg.get('content')
-
-                    if not text:
-                        if 'sticker_items' in msg and msg['sticker_items']:
-                            sticker_name = msg['sticker_items'][0].get('name')
-                            if sticker_name:
-                                text = f"Sticker: '{sticker_name}'"
-                        elif 'embeds' in msg and msg['embeds']:
-                            embed_desc = msg['embeds'][0].get('description')
-                            if embed_desc:
-                                text = embed_desc
-
-                    if sender and text:
-                        msgs.append({
-                            'source': 'Discord',
-                            'timestamp': timestamp,
-                            'sender': sender,
-                            'message': text.strip()
-                        })
-
-                break
-            except json.JSONDecodeError:
-                print("Warning: Found a script with 'let messages' but failed to decode JSON.")
-                continue
+        if MESSAGES_ARRAY_START.search(script_text):
+            msgs = _collect_discord_json(script_text)
+            if msgs:
+                return msgs
 
-    return msgs
+    return []
+
+
+def stream_discord_json(file_obj, head: bytes = b''):
+    """
+    Decodes the embedded array straight from the raw file. Script bodies are not
+    entity-decoded, so no DOM is needed to get at the payload.
+    """
+    return _collect_discord_json((head + file_obj.read()).decode('utf-8', errors='ignore'))
 
 
 def extract_discord_html(tree):
@@ -1,44 +1,71 @@
-def extract_facebook(tree):
-    msgs = []
-    message_divs = tree.css('div._3-95._a6-g')
-    timestamp_divs = tree.css('div._3-94._a6-o')
+MESSAGE_CLASSES = {'_3-95', '_a6-g'}
+SENDER_CLASSES = {'_2ph_', '_a6-h', '_a6-i'}
+CONTENT_CLASSES = {'_2ph_', '_a6-p'}
+TIMESTAMP_CLASSES = {'_3-94', '_a6-o'}
+TIMESTAMP_TEXT_CLASS = '_a72d'
+
 
-    for i, msg_div in enumerate(message_divs):
-        sender_div = msg_div.css_first('div._2ph_._a6-h._a6-i')
-        sender = sender_div.text(strip=True) if sender_div else None
+def iter_facebook(tree):
+    """
+    Yields Facebook messages from a single document-order walk over the tree's divs.
 
-        if not sender:
-            sender_div_fallback = msg_div.css_first('div[data-tooltip-content]')
-            if sender_div_fallback:
-                sender = sender_div_fallback.text(strip=True)
+    Sender, body and timestamp are attached to the most recent message container, so a
+    timestamp always pairs with the message it follows instead of with whatever sits at
+    the same index in a separate list.
+    """
+    current = None
+    root = tree.body or tree.root
+    for node in root.traverse(include_text=False):
+        if node.tag != 'div':
+            continue
+        attributes = node.attributes
+        class_attr = attributes.get('class')
+        classes = set(class_attr.split()) if class_attr else ()
 
-        if not sender:
+        if MESSAGE_CLASSES.issubset(classes):
+            message = _finish_message(current)
+            if message:
+                yield message
+            current = {'sender': None, 'sender_seen': False, 'fallback_sender': None,
+                       'text': None, 'content_seen': False, 'timestamp': None, 'timestamp_state': None}
+        elif current is None:
             continue
+        elif not current['sender_seen'] and SENDER_CLASSES.issubset(classes):
+            current['sender_seen'] = True
+            current['sender'] = node.text(strip=True)
+        elif not current['content_seen'] and CONTENT_CLASSES.issubset(classes):
+            current['content_seen'] = True
+            current['text'] = node.text(strip=True)
+        elif current['timestamp_state'] is None and TIMESTAMP_CLASSES.issubset(classes):
+            current['timestamp_state'] = 'container'
+            current['timestamp'] = node.text(strip=True)
+        elif current['timestamp_state'] == 'container' and TIMESTAMP_TEXT_CLASS in classes:
+            # Prefer the dedicated text div inside the timestamp container when there is one.
+            current['timestamp_state'] = 'text'
+            current['timestamp'] = node.text(strip=True)
+
+        if current is not None and current['fallback_sender'] is None and 'data-tooltip-content' in attributes:
+            current['fallback_sender'] = node.text(strip=True)
+
+    message = _finish_message(current)
+    if message:
+        yield message
 
-        content_div = msg_div.css_first('div._2ph_._a6-p')
-        text = None
-        if content_div:
-            text = content_div.text(strip=True)
-            if not text:
-                # Try nested tags
-                for tag in content_div.css('p, span, div'):
-                    content = tag.text(strip=True)
-                    if content:
-                        text = content
-                        break
-
-        timestamp = None
-        if i < len(timestamp_divs):
-            ts_div = timestamp_divs[i].css_first('div._a72d') or timestamp_divs[i]
-            if ts_div:
-                timestamp = ts_div.text(strip=True)
-
-        if sender and text and len(text.strip()) > 0:
-            msgs.append({
-                'source': 'Facebook',
-                'timestamp': timestamp,
-                'sender': sender,
-                'message': text.strip()
-            })
-
-    return msgs
\ No newline at end of file
+
+def _finish_message(record):
+    if not record:
+        return None
+    sender = record['sender'] or record['fallback_sender']
+    text = record['text']
+    if sender and text and len(text.strip()) > 0:
+        return {
+            'source': 'Facebook',
+            'timestamp': record['timestamp'],
+            'sender': sender,
+            'message': text.strip()
+        }
+    return None
+
+
+def extract_facebook(tree):
+    return list(iter_facebook(tree))
@@ -1,3 +1,9 @@
+import re
+
+# Opening tag of every message container; shards of one export are cut here.
+MESSAGE_BOUNDARY = re.compile(r'<div class="message[ "]')
+
+
 def extract_imessage(tree):
     msgs = []
 
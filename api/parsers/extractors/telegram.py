@@ -1,8 +1,18 @@
-def extract_telegram(tree):
-    msgs = []
-    last_sender = None
+import re
+from selectolax.parser import HTMLParser
+from ..html_stream import iter_html_fragments
+
+# Opening tag of every Telegram message container ("message default clearfix", "message service", ...).
+MESSAGE_BOUNDARY = re.compile(r'<div class="message[ "]')
+# Messages parsed per small tree when streaming; bounds memory without paying parser setup per message.
+STREAM_BATCH_SIZE = 256
+# Stand-in sender for joined messages at the start of a shard, resolved once shards are stitched.
+PENDING_SENDER = '\x00pending-sender'
 
-    for div in tree.css('div.message'):
+
+def iter_telegram(message_divs, last_sender=None):
+    """Yields message dicts from div.message nodes, carrying the sender over joined messages."""
+    for div in message_divs:
         ts = div.css_first('div.pull_right.date.details')
         timestamp = ts.attributes.get('title') if ts else None
         name = div.css_first('div.from_name')
@@ -12,11 +22,51 @@ def extract_telegram(tree):
         text = txt.text(strip=True) if txt else None
 
         if text and sender:
-            msgs.append({
+            yield {
                 'source': 'Telegram',
                 'timestamp': timestamp,
                 'sender': sender,
                 'message': text
-            })
+            }
+
+
+def extract_telegram(tree):
+    return list(iter_telegram(tree.css('div.message')))
+
+
+def extract_telegram_shard(tree):
+    """
+    Extracts one shard of a larger messages.html. Joined messages before the shard's
+    first named sender get PENDING_SENDER; the sender carried out of the shard is
+    returned alongside so the caller can resolve the next shard.
+    """
+    message_divs = tree.css('div.message')
+    messages = list(iter_telegram(message_divs, last_sender=PENDING_SENDER))
+
+    last_sender = PENDING_SENDER
+    for div in reversed(message_divs):
+        name = div.css_first('div.from_name')
+        if name and name.text(strip=True):
+            last_sender = name.text(strip=True)
+            break
+    return messages, last_sender
+
+
+def stream_telegram(file_obj, head: bytes = b'', batch_size: int = STREAM_BATCH_SIZE):
+    """
+    Streaming counterpart of extract_telegram for very large messages.html files. The raw
+    HTML is cut at message boundaries and parsed a small batch of messages at a time, so
+    no tree for the whole document is ever built.
+    """
+    return iter_telegram(_iter_batched_message_divs(file_obj, head, batch_size))
+
 
-    return msgs
\ No newline at end of file
+def _iter_batched_message_divs(file_obj, head: bytes, batch_size: int):
+    batch = []
+    for fragment in iter_html_fragments(file_obj, MESSAGE_BOUNDARY, head):
+        batch.append(fragment)
+        if len(batch) >= batch_size:
+            yield from HTMLParser(''.join(batch)).css('div.message')
+            batch = []
+    if batch:
+        yield from HTMLParser(''.join(batch)).css('div.message')
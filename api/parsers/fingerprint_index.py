@@ -0,0 +1,77 @@
+import base64
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+from .utils import message_fingerprint
+
+
+class FingerprintIndex:
+    """
+    Set of 64-bit message fingerprints backed by a sorted array('Q'), i.e. 8 bytes per
+    message instead of a set of hex digests. New fingerprints go into a small pending
+    set that is folded into the array once it grows past a fraction of it, so lookups
+    stay a bisect plus a set probe.
+    """
+
+    _MIN_PENDING = 4096
+
+    def __init__(self, fingerprints: Iterable[int] = ()):
+        self._sorted = array('Q', sorted(set(fingerprints)))
+        self._pending = set()
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[dict]) -> 'FingerprintIndex':
+        return cls(message_fingerprint(msg) for msg in messages)
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self._pending or self._in_sorted(fingerprint)
+
+    def _in_sorted(self, fingerprint: int) -> bool:
+        i = bisect_left(self._sorted, fingerprint)
+        return i < len(self._sorted) and self._sorted[i] == fingerprint
+
+    def add(self, fingerprint: int) -> bool:
+        """Adds `fingerprint`; returns False if it was already present."""
+        if fingerprint in self:
+            return False
+        self._pending.add(fingerprint)
+        if len(self._pending) > max(self._MIN_PENDING, len(self._sorted) >> 3):
+            self._compact()
+        return True
+
+    def update(self, fingerprints: Iterable[int]):
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+
+    def _compact(self):
+        if self._pending:
+            self._sorted = array('Q', sorted(self._sorted.tolist() + list(self._pending)))
+            self._pending = set()
+
+    def to_bytes(self) -> bytes:
+        self._compact()
+        data = self._sorted
+        if sys.byteorder != 'little':
+            data = array('Q', data)
+            data.byteswap()
+        return data.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'FingerprintIndex':
+        index = cls()
+        index._sorted.frombytes(data)
+        if sys.byteorder != 'little':
+            index._sorted.byteswap()
+        return index
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    @classmethod
+    def from_base64(cls, data: str) -> 'FingerprintIndex':
+        return cls.from_bytes(base64.b64decode(data))
@@ -0,0 +1,50 @@
+import codecs
+import re
+from typing import BinaryIO, Iterator
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_html_fragments(file_obj: BinaryIO, boundary: re.Pattern, head: bytes = b'',
+                        chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Incrementally splits raw HTML into fragments that each start at a `boundary` match,
+    e.g. the opening tag of a message container. Text before the first boundary is
+    dropped; the last fragment runs to the end of the document. The file is read in
+    chunks, so memory use follows the largest fragment rather than the file size.
+
+    `head` holds bytes already consumed from `file_obj` (for instance by sniffing).
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    buffer = decoder.decode(head)
+    # A boundary split across two reads is found on the next pass, so only the last
+    # few characters of the buffer need re-scanning after each read.
+    overlap = 256
+    scan_from = 0
+    start = None
+
+    while True:
+        chunk = file_obj.read(chunk_size)
+        buffer += decoder.decode(chunk, final=not chunk)
+
+        match = boundary.search(buffer, scan_from)
+        while match:
+            if start is not None:
+                yield buffer[start:match.start()]
+            start = match.start()
+            match = boundary.search(buffer, match.end())
+
+        if start is None:
+            # No boundary yet; keep only enough of the prelude to catch a split match.
+            buffer = buffer[-overlap:]
+            scan_from = 0
+        else:
+            buffer = buffer[start:]
+            start = 0
+            scan_from = max(1, len(buffer) - overlap)
+
+        if not chunk:
+            break
+
+    if start is not None and buffer:
+        yield buffer
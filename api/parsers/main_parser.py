@@ -1,69 +1,158 @@
 import json
-from datetime import datetime
+from operator import itemgetter
+from zipfile import ZipFile
 
 from selectolax.parser import HTMLParser
 
 from .config import Config
-from .date_parser import parse_datetime_comprehensive
+from .date_parser import TimestampParser, wall_clock_epoch
 from .detector import PlatformDetector
-from .extractors import EXTRACTOR_MAP
+from .extractors import EXTRACTOR_MAP, STREAMING_EXTRACTOR_MAP
 from .json_parser import parse_generic_json
-from .utils import generate_message_hash
+from .parse_cache import ParseCache
+from .sharding import extract_messages_sharded
+from .fingerprint_index import FingerprintIndex
+from .utils import message_fingerprint
+from ..utils import log
 
 
-def process_single_file(file_obj, seen_hashes: set):
-    unique_msgs_from_this_file = []
-    filename = getattr(file_obj, 'filename', getattr(file_obj, 'name', 'unknown_file'))
-    extracted_messages = []
+def _file_name(file_obj) -> str:
+    return getattr(file_obj, 'filename', getattr(file_obj, 'name', 'unknown_file'))
 
-    try:
-        if filename.lower().endswith('.json'):
-            content = file_obj.read().decode('utf-8', errors='ignore')
-            extracted_messages = parse_generic_json(json.loads(content))
-        else:
-            content = file_obj.read().decode('utf-8', errors='ignore')
-            tree = HTMLParser(content)
-            platform = PlatformDetector.detect_platform(tree)
-            extractor_func = EXTRACTOR_MAP.get(platform)
-
-            if extractor_func:
-                platform_name = platform.replace('_', ' ').title()
-                extracted_messages = extractor_func(tree)
-                print(f"Detected {platform_name} in {filename}, extracted {len(extracted_messages)} messages.")
-            else:
-                print(f"Warning: Unknown or unsupported format in {filename}. Skipping.")
 
+def _extract_messages(file_obj) -> list:
+    """Runs the matching extractor over one export file and returns its raw messages; errors propagate."""
+    filename = _file_name(file_obj)
+
+    if filename.lower().endswith('.json'):
+        content = file_obj.read().decode('utf-8', errors='ignore')
+        return parse_generic_json(json.loads(content))
+
+    # Classify from raw bytes first so unrelated HTML never gets a DOM built.
+    head = file_obj.read(PlatformDetector.SNIFF_BYTES)
+    platform = PlatformDetector.sniff_platform(head)
+    if platform is None:
+        head += file_obj.read()
+        platform = PlatformDetector.scan_platform(head)
+
+    if platform in STREAMING_EXTRACTOR_MAP:
+        extracted_messages = list(STREAMING_EXTRACTOR_MAP[platform](file_obj, head))
+    elif platform in EXTRACTOR_MAP:
+        raw = head + file_obj.read()
+        extracted_messages = EXTRACTOR_MAP[platform](HTMLParser(raw.decode('utf-8', errors='ignore')))
+    else:
+        print(f"Warning: Unknown or unsupported format in {filename}. Skipping.")
+        return []
+
+    platform_name = platform.replace('_', ' ').title()
+    print(f"Detected {platform_name} in {filename}, extracted {len(extracted_messages)} messages.")
+    return extracted_messages
+
+
+def extract_messages_from_file(file_obj) -> list:
+    """Runs the matching extractor over one export file and returns its raw messages, or [] on error."""
+    try:
+        return _extract_messages(file_obj)
     except Exception as e:
-        print(f"Error processing file {filename}: {e}")
+        print(f"Error processing file {_file_name(file_obj)}: {e}")
         return []
 
-    for msg in extracted_messages:
+
+def filter_unseen_messages(messages: list, seen: FingerprintIndex) -> list:
+    """Drops empty messages and any message whose fingerprint is already in `seen`."""
+    unique_msgs = []
+    for msg in messages:
         if not msg.get('message'):
-             continue
-        content_hash = generate_message_hash(msg)
-        if content_hash not in seen_hashes:
-            seen_hashes.add(content_hash)
-            unique_msgs_from_this_file.append(msg)
+            continue
+        if seen.add(message_fingerprint(msg)):
+            unique_msgs.append(msg)
+
+    return unique_msgs
+
+
+def extract_messages_from_large_file(file_obj, max_workers: int) -> list:
+    """
+    Sharded, multi-process extraction for one big HTML file; falls back to a single
+    pass. Errors from that single pass propagate.
+    """
+    filename = _file_name(file_obj)
+    if not filename.lower().endswith('.json'):
+        try:
+            messages = extract_messages_sharded(file_obj, max_workers)
+            if messages is not None:
+                return messages
+        except Exception as e:
+            print(f"Sharded parsing of {filename} failed, retrying in a single pass: {e}")
+            file_obj.seek(0)
+    return _extract_messages(file_obj)
 
-    return unique_msgs_from_this_file
+
+def extract_messages_cached(file_obj, cache: ParseCache = None, max_workers: int = 1) -> list:
+    """
+    Extracts a file's messages, short-circuited by `cache` when this content was parsed
+    before. With `max_workers` > 1 the file is parsed in shards across processes. A
+    file that fails to parse yields [] and is not cached, so a later upload retries it.
+    """
+    key = cache.key_for_file(file_obj) if cache is not None else None
+    if key is not None:
+        messages = cache.get(key)
+        if messages is not None:
+            return messages
+
+    try:
+        if max_workers > 1:
+            messages = extract_messages_from_large_file(file_obj, max_workers)
+        else:
+            messages = _extract_messages(file_obj)
+    except Exception as e:
+        print(f"Error processing file {_file_name(file_obj)}: {e}")
+        return []
+
+    if key is not None:
+        cache.put(key, messages)
+    return messages
+
+
+def process_single_file(file_obj, seen: FingerprintIndex, cache: ParseCache = None, max_workers: int = 1):
+    return filter_unseen_messages(extract_messages_cached(file_obj, cache, max_workers), seen)
+
+
+def parse_archive_member(archive_path: str, member_name: str, cache_dir: str = None,
+                         cache_max_bytes: int = 0, cache_max_age_seconds: int = 0) -> tuple:
+    """
+    Parses a single ZIP member. Module-level so it can run in a process pool; each
+    call opens its own handle on the archive and dedups only within the member.
+    Returns the messages and this call's parse cache hit/miss counts.
+    """
+    cache = ParseCache(cache_dir, cache_max_bytes, cache_max_age_seconds) if cache_dir else None
+    with ZipFile(archive_path, 'r') as archive:
+        with archive.open(member_name) as file_obj:
+            setattr(file_obj, 'filename', member_name)
+            messages = process_single_file(file_obj, FingerprintIndex(), cache)
+    return messages, cache.stats() if cache else {'hits': 0, 'misses': 0}
 
 def deduplicate_and_sort_messages(unique_messages_list: list):
+    """
+    Normalises every timestamp and sorts the messages chronologically. Each message is
+    parsed once and sorted on an integer wall-clock epoch; the TARGET_FORMAT string is
+    only rendered afterwards, for storage.
+    """
     if not unique_messages_list:
         return []
 
-    standardized = []
+    timestamp_parser = TimestampParser()
+    keyed = []
     for msg in unique_messages_list:
-        dt = parse_datetime_comprehensive(msg.get('timestamp', ''))
+        dt = timestamp_parser.parse(msg.get('timestamp', ''), msg.get('source'))
         if dt:
-            msg['timestamp'] = dt.strftime(Config.TARGET_FORMAT)
-            standardized.append(msg)
+            keyed.append((wall_clock_epoch(dt), dt, msg))
+    log(f"Timestamp parsing: {timestamp_parser.hit_rates()}")
 
-    def sort_key(msg):
-        try:
-            return datetime.strptime(msg.get('timestamp'), Config.TARGET_FORMAT)
-        except (ValueError, TypeError):
-            return datetime.min
+    keyed.sort(key=itemgetter(0))
 
-    standardized.sort(key=sort_key)
+    standardized = []
+    for _, dt, msg in keyed:
+        msg['timestamp'] = dt.strftime(Config.TARGET_FORMAT)
+        standardized.append(msg)
 
-    return standardized
\ No newline at end of file
+    return standardized
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+import zlib
+from typing import BinaryIO, Optional
+
+# Bump whenever an extractor's output changes so stale entries are never served.
+PARSE_CACHE_VERSION = 1
+MESSAGE_FIELDS = ('source', 'timestamp', 'sender', 'message')
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+
+class ParseCache:
+    """
+    On-disk cache of extracted messages keyed by the content hash of the export file
+    (or ZIP member) they came from. Entries are zlib-compressed column-oriented JSON,
+    written atomically so several parser processes can share one directory. Entries
+    unused for `max_age_seconds` are removed, and the least recently used ones are
+    evicted once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key_for_file(file_obj: BinaryIO) -> str:
+        """Content hash of a whole file; leaves the file positioned at its start."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{PARSE_CACHE_VERSION}:".encode())
+        while True:
+            buf = file_obj.read(_HASH_BUFFER_SIZE)
+            if not buf:
+                break
+            digest.update(buf)
+        file_obj.seek(0)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.msgs.z")
+
+    def get(self, key: str) -> Optional[list]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = json.loads(zlib.decompress(f.read()))
+            os.utime(path)  # Recency for LRU eviction.
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        columns = [payload[field] for field in MESSAGE_FIELDS]
+        return [dict(zip(MESSAGE_FIELDS, row)) for row in zip(*columns)]
+
+    def put(self, key: str, messages: list):
+        payload = {field: [msg.get(field) for msg in messages] for field in MESSAGE_FIELDS}
+        data = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'), 6)
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write parse cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.cleanup_stale()
+
+    def cleanup_stale(self):
+        """Removes entries unused for `max_age_seconds`, then evicts by size."""
+        cutoff = time.time() - self.max_age_seconds if self.max_age_seconds > 0 else None
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.msgs.z'):
+                continue
+            try:
+                stat = entry.stat()
+                if cutoff is not None and stat.st_mtime < cutoff:
+                    os.remove(entry.path)
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,96 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from selectolax.parser import HTMLParser
+
+from .detector import PlatformDetector
+from .extractors import EXTRACTOR_MAP
+from .extractors.discord import CHAT_MSG_BOUNDARY
+from .extractors.imessage import MESSAGE_BOUNDARY as IMESSAGE_BOUNDARY
+from .extractors.telegram import MESSAGE_BOUNDARY as TELEGRAM_BOUNDARY, PENDING_SENDER, extract_telegram_shard
+from .html_stream import iter_html_fragments
+
+# Platforms whose exports are a flat run of message containers that can be cut apart.
+SHARD_BOUNDARIES = {
+    'telegram': TELEGRAM_BOUNDARY,
+    'imessage': IMESSAGE_BOUNDARY,
+    'discord': CHAT_MSG_BOUNDARY,
+}
+# Characters of HTML per shard: large enough to amortise pickling, small enough to spread work.
+SHARD_TARGET_CHARS = 4 * 1024 * 1024
+
+
+def parse_html_shard(platform: str, html: str) -> tuple:
+    """Runs in a pool worker. Returns the shard's messages and the sender it carries out."""
+    tree = HTMLParser(html)
+    if platform == 'telegram':
+        return extract_telegram_shard(tree)
+    return EXTRACTOR_MAP[platform](tree), None
+
+
+def _iter_shards(file_obj, boundary, head: bytes, target_chars: int):
+    shard = []
+    size = 0
+    for fragment in iter_html_fragments(file_obj, boundary, head):
+        shard.append(fragment)
+        size += len(fragment)
+        if size >= target_chars:
+            yield ''.join(shard)
+            shard = []
+            size = 0
+    if shard:
+        yield ''.join(shard)
+
+
+def _stitch_shards(shard_results: list) -> list:
+    """Concatenates shard output in order, giving leading joined messages the previous shard's sender."""
+    messages = []
+    carried_sender = None
+    for shard_messages, last_sender in shard_results:
+        for msg in shard_messages:
+            if msg['sender'] == PENDING_SENDER:
+                if not carried_sender:
+                    continue
+                msg['sender'] = carried_sender
+            messages.append(msg)
+        if last_sender and last_sender != PENDING_SENDER:
+            carried_sender = last_sender
+    return messages
+
+
+def extract_messages_sharded(file_obj, max_workers: int, target_chars: int = SHARD_TARGET_CHARS) -> Optional[list]:
+    """
+    Parses one large HTML export on several cores. The raw file is cut at message
+    container boundaries into shards that are parsed in a process pool with the
+    regular extractors and stitched back together in document order.
+
+    Returns None, with the file rewound, when the platform cannot be sharded.
+    """
+    filename = getattr(file_obj, 'filename', getattr(file_obj, 'name', 'unknown_file'))
+    head = file_obj.read(PlatformDetector.SNIFF_BYTES)
+    platform = PlatformDetector.sniff_platform(head)
+    boundary = SHARD_BOUNDARIES.get(platform)
+    if boundary is None:
+        file_obj.seek(0)
+        return None
+
+    shard_results = []
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        # Only a couple of shards per worker are in flight, so the file is never fully in memory.
+        in_flight = deque()
+        for shard in _iter_shards(file_obj, boundary, head, target_chars):
+            in_flight.append(executor.submit(parse_html_shard, platform, shard))
+            if len(in_flight) >= max_workers * 2:
+                shard_results.append(in_flight.popleft().result())
+        while in_flight:
+            shard_results.append(in_flight.popleft().result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    messages = _stitch_shards(shard_results)
+    platform_name = platform.replace('_', ' ').title()
+    print(f"Detected {platform_name} in {filename}, extracted {len(messages)} messages from {len(shard_results)} shards.")
+    return messages
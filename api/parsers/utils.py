@@ -1,8 +1,15 @@
 import hashlib
 
-def generate_message_hash(message: dict) -> str:
-    ts = str(message.get('timestamp', ''))
-    sender = str(message.get('sender', ''))
-    message_content = str(message.get('message', ''))
-    unique_string = f"{ts}{sender}{message_content}"
-    return hashlib.sha256(unique_string.encode('utf-8')).hexdigest()
\ No newline at end of file
+# Unit separator between fields, so ("ab", "c") and ("a", "bc") never collide.
+_FIELD_SEPARATOR = '\x1f'
+
+
+def message_fingerprint(message: dict) -> int:
+    """64-bit content fingerprint of a message (timestamp, sender and text)."""
+    unique_string = _FIELD_SEPARATOR.join((
+        str(message.get('timestamp', '')),
+        str(message.get('sender', '')),
+        str(message.get('message', '')),
+    ))
+    digest = hashlib.blake2b(unique_string.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
@@ -11,6 +11,8 @@ analysis_bp = Blueprint('analysis', __name__)
 def analyze_data_endpoint():
     payload = request.get_json(silent=True) or {}
     modules_to_run = payload.get('modules_to_run')
+    exclude_info_sharing = bool(payload.get('exclude_info_sharing', True))
+    force_recompute = bool(payload.get('force_recompute', False))
 
     session_id = session_manager.get_session_id()
 
@@ -21,7 +23,8 @@ def analyze_data_endpoint():
 
     task_manager = get_task_manager()
     task_id = task_manager.submit_task(
-        session_id, run_analysis_worker, session_id, modules_to_run=modules_to_run
+        session_id, run_analysis_worker, session_id, modules_to_run=modules_to_run,
+        exclude_info_sharing=exclude_info_sharing, force_recompute=force_recompute
     )
 
     log(f"Submitted analysis task {task_id} for session {session_id}")
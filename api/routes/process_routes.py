@@ -1,9 +1,13 @@
 # chat_analysis/routes/process_routes.py
+import os
+import uuid
+from functools import partial
 from flask import Blueprint, request, jsonify
+from ..config import Config
 from ..session_manager import session_manager
 from ..utils import log
 from ..background_task_manager import get_task_manager
-from ..workers import process_file_worker
+from ..workers import process_file_worker, discard_spooled_upload
 
 process_bp = Blueprint('process', __name__)
 
@@ -16,10 +20,18 @@ def process_data_endpoint():
     if uploaded_file.filename == '':
         return jsonify({"error": "No selected file"}), 400
 
+    # append=true merges this upload into the session's messages instead of replacing them.
+    append = request.form.get('append', request.args.get('append', '')).lower() in ('1', 'true', 'yes')
+
+    spool_path = None
     try:
-        file_content = uploaded_file.read()
         filename = uploaded_file.filename
 
+        # Spool the body to disk once; the worker reads (and later deletes) this file,
+        # so no copy of the raw bytes sits in memory or in the task queue.
+        spool_path = os.path.join(Config.UPLOAD_FOLDER, f"{uuid.uuid4().hex}{os.path.splitext(filename)[1]}")
+        uploaded_file.save(spool_path)
+
         task_manager = get_task_manager()
         session_id = session_manager.get_session_id()
 
@@ -28,15 +40,20 @@ def process_data_endpoint():
             session_id,
             process_file_worker, # Use the directly integrated worker
             session_id,
-            file_content,
-            filename
+            spool_path,
+            filename,
+            append=append,
+            on_skip=partial(discard_spooled_upload, spool_path)
         )
+        spool_path = None  # Owned by the task from here on
 
-        log(f"Started file processing task {task_id} for file '{filename}'.")
+        log(f"Started file processing task {task_id} for file '{filename}' ({'append' if append else 'replace'}).")
 
         initial_status = task_manager.get_task_status(task_id)
         return jsonify(initial_status), 202
 
     except Exception as e:
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
         log(f"ERROR: An unexpected error occurred in the /process endpoint: {e}")
         return jsonify({"error": "An internal server error occurred.", "details": str(e)}), 500
\ No newline at end of file
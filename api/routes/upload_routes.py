@@ -0,0 +1,103 @@
+import os
+from functools import partial
+from flask import Blueprint, request, jsonify
+from ..session_manager import session_manager
+from ..utils import log
+from ..background_task_manager import get_task_manager
+from ..upload_manager import get_upload_manager, UploadError
+from ..workers import process_file_worker, discard_spooled_upload
+
+upload_bp = Blueprint('upload', __name__)
+
+
+def _upload_error_response(e: UploadError):
+    return jsonify({"error": str(e), **e.details}), e.status_code
+
+
+@upload_bp.route('/init', methods=['POST'])
+def init_upload_endpoint():
+    payload = request.get_json(silent=True) or {}
+    filename = payload.get('filename')
+    if not filename:
+        return jsonify({"error": "filename is required."}), 400
+    try:
+        total_size = int(payload.get('total_size', 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "total_size must be an integer."}), 400
+
+    try:
+        manifest = get_upload_manager().init_upload(
+            session_manager.get_session_id(), filename, total_size, append=bool(payload.get('append'))
+        )
+    except UploadError as e:
+        return _upload_error_response(e)
+    return jsonify(manifest), 201
+
+
+@upload_bp.route('/<upload_id>', methods=['GET'])
+def upload_status_endpoint(upload_id):
+    try:
+        return jsonify(get_upload_manager().get_status(session_manager.get_session_id(), upload_id))
+    except UploadError as e:
+        return _upload_error_response(e)
+
+
+@upload_bp.route('/<upload_id>/chunk', methods=['PUT'])
+def upload_chunk_endpoint(upload_id):
+    """
+    Body is the raw chunk bytes. `offset` (query arg) is where the chunk starts and the
+    X-Chunk-SHA256 header is its hex digest.
+    """
+    try:
+        offset = int(request.args.get('offset', ''))
+    except ValueError:
+        return jsonify({"error": "offset query parameter is required."}), 400
+
+    try:
+        manifest = get_upload_manager().append_chunk(
+            session_manager.get_session_id(), upload_id, offset, request.stream,
+            request.headers.get('X-Chunk-SHA256', '')
+        )
+    except UploadError as e:
+        return _upload_error_response(e)
+    return jsonify({"received": manifest['received'], "total_size": manifest['total_size']})
+
+
+@upload_bp.route('/<upload_id>/finalize', methods=['POST'])
+def finalize_upload_endpoint(upload_id):
+    session_id = session_manager.get_session_id()
+    final_path = None
+    try:
+        final_path, manifest = get_upload_manager().finalize(session_id, upload_id)
+
+        task_manager = get_task_manager()
+        task_id = task_manager.submit_task(
+            session_id,
+            process_file_worker,
+            session_id,
+            final_path,
+            manifest['filename'],
+            append=manifest['append'],
+            on_skip=partial(discard_spooled_upload, final_path)
+        )
+        final_path = None  # Owned by the task from here on
+
+        log(f"Started file processing task {task_id} for chunked upload {upload_id} ('{manifest['filename']}').")
+        return jsonify(task_manager.get_task_status(task_id)), 202
+
+    except UploadError as e:
+        return _upload_error_response(e)
+    except Exception as e:
+        if final_path and os.path.exists(final_path):
+            os.remove(final_path)
+        log(f"ERROR: An unexpected error occurred finalizing upload {upload_id}: {e}")
+        return jsonify({"error": "An internal server error occurred.", "details": str(e)}), 500
+
+
+@upload_bp.route('/<upload_id>', methods=['DELETE'])
+def abort_upload_endpoint(upload_id):
+    try:
+        get_upload_manager().abort(session_manager.get_session_id(), upload_id)
+    except UploadError as e:
+        return _upload_error_response(e)
+    return jsonify({"message": f"Upload {upload_id} has been discarded."})
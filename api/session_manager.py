@@ -1,5 +1,6 @@
 import uuid
 import json
+import heapq
 import psycopg2
 import time
 from psycopg2 import pool
@@ -7,7 +8,9 @@ from psycopg2 import OperationalError
 from contextlib import contextmanager
 from flask import session
 from datetime import datetime
+from operator import itemgetter
 from .config import Config
+from .parsers.fingerprint_index import FingerprintIndex
 
 
 class PostgresSessionManager:
@@ -149,7 +152,7 @@ class PostgresSessionManager:
         try:
             with self._execute() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(sql, (session_id,))
+                    cur.execute(sql, (session_id, data_type))
                     rows_affected = cur.rowcount
                     conn.commit()
                     print(f"Cleared {data_type} data for session {session_id} ({rows_affected} rows)")
@@ -164,13 +167,99 @@ class PostgresSessionManager:
     def store_processed_messages(self, session_id: str, messages: list):
         data = {'messages': messages, 'count': len(messages), 'timestamp': self._get_current_timestamp()}
         self._update_session_data(session_id, 'processed', data)
+        self._clear_processed_runs(session_id)
+        self.store_fingerprint_index(session_id, FingerprintIndex.from_messages(messages))
+
+    def append_processed_messages(self, session_id: str, messages: list, index: FingerprintIndex):
+        """
+        Adds an already sorted and deduplicated batch to the session's processed messages.
+        Only the new batch is written, as a sorted run next to the existing ones, and
+        `index` (which must already include the batch) replaces the stored fingerprints.
+        Runs are merged back into the main blob once there are more than MAX_PROCESSED_RUNS.
+        """
+        if not messages:
+            return
+        manifest = self._get_session_data(session_id, 'processed_runs') or {'runs': [], 'count': 0}
+        if len(manifest['runs']) >= Config.MAX_PROCESSED_RUNS:
+            self.store_processed_messages(session_id, list(heapq.merge(
+                self.get_processed_messages(session_id) or [], messages, key=itemgetter('timestamp')
+            )))
+            return
+
+        run_type = f"processed_run_{len(manifest['runs']) + 1}"
+        self._update_session_data(session_id, run_type, {
+            'messages': messages, 'count': len(messages), 'timestamp': self._get_current_timestamp()
+        })
+        manifest['runs'].append(run_type)
+        manifest['count'] += len(messages)
+        self._update_session_data(session_id, 'processed_runs', manifest)
+        self.store_fingerprint_index(session_id, index)
 
     def get_processed_messages(self, session_id: str):
         data = self._get_session_data(session_id, 'processed')
-        return data.get('messages') if data else None
+        manifest = self._get_session_data(session_id, 'processed_runs')
+        if not manifest or not manifest.get('runs'):
+            return data.get('messages') if data else None
+
+        # Every run is sorted on the TARGET_FORMAT timestamp, which orders lexically.
+        runs = [data.get('messages', []) if data else []]
+        for run_type in manifest['runs']:
+            run = self._get_session_data(session_id, run_type)
+            if run:
+                runs.append(run.get('messages', []))
+        return list(heapq.merge(*runs, key=itemgetter('timestamp')))
+
+    def get_processed_senders(self, session_id: str):
+        """Distinct senders across the processed blob and its runs, computed in the database."""
+        sql = """
+              SELECT DISTINCT msg ->> 'sender'
+              FROM gateway_session_data, jsonb_array_elements(data_content -> 'messages') AS msg
+              WHERE session_id = %s AND (data_type = 'processed' OR data_type LIKE 'processed\\_run\\_%%');
+              """
+        try:
+            with self._execute() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (session_id,))
+                    return sorted(row[0] for row in cur.fetchall() if row[0])
+        except Exception as error:
+            print(f"Error getting processed senders: {error}")
+            return []
 
     def clear_processed_messages(self, session_id: str):
         self._clear_session_data_by_type(session_id, 'processed')
+        self._clear_processed_runs(session_id)
+        self.clear_fingerprint_index(session_id)
+
+    def _clear_processed_runs(self, session_id: str):
+        sql = "DELETE FROM gateway_session_data WHERE session_id = %s AND data_type LIKE 'processed\\_run%%';"
+        try:
+            with self._execute() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (session_id,))
+                    conn.commit()
+        except Exception as error:
+            print(f"Error clearing processed runs: {error}")
+            raise
+
+    def store_fingerprint_index(self, session_id: str, index: FingerprintIndex):
+        data = {'fingerprints': index.to_base64(), 'count': len(index), 'timestamp': self._get_current_timestamp()}
+        self._update_session_data(session_id, 'fingerprints', data)
+
+    def get_fingerprint_index(self, session_id: str):
+        """
+        Fingerprints of the session's processed messages. Sessions stored before the
+        index existed get it rebuilt from their messages, and stored, on first use.
+        """
+        data = self._get_session_data(session_id, 'fingerprints')
+        if data and data.get('fingerprints'):
+            return FingerprintIndex.from_base64(data['fingerprints'])
+        index = FingerprintIndex.from_messages(self.get_processed_messages(session_id) or [])
+        if len(index):
+            self.store_fingerprint_index(session_id, index)
+        return index
+
+    def clear_fingerprint_index(self, session_id: str):
+        self._clear_session_data_by_type(session_id, 'fingerprints')
 
     def store_filtered_messages(self, session_id: str, filtered_data: dict):
         if 'timestamp' not in filtered_data:
@@ -178,12 +267,25 @@ class PostgresSessionManager:
         if 'count' not in filtered_data and 'messages' in filtered_data:
             filtered_data['count'] = len(filtered_data['messages'])
         self._update_session_data(session_id, 'filtered', filtered_data)
+        # Cached module results are keyed by the filtered data they came from.
+        self.clear_module_cache(session_id)
 
     def get_filtered_messages(self, session_id: str):
         return self._get_session_data(session_id, 'filtered')
 
     def clear_filtered_messages(self, session_id: str):
         self._clear_session_data_by_type(session_id, 'filtered')
+        self.clear_module_cache(session_id)
+
+    def store_module_cache(self, session_id: str, module_cache: dict):
+        module_cache['timestamp'] = self._get_current_timestamp()
+        self._update_session_data(session_id, 'module_cache', module_cache)
+
+    def get_module_cache(self, session_id: str):
+        return self._get_session_data(session_id, 'module_cache')
+
+    def clear_module_cache(self, session_id: str):
+        self._clear_session_data_by_type(session_id, 'module_cache')
 
     def store_analysis_result(self, session_id: str, result: dict):
         if 'timestamp' not in result:
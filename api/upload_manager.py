@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import BinaryIO
+
+from .config import Config
+from .utils import ensure_dir, log
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised for a rejected upload operation; `status_code` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400, **details):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+class ChunkedUploadManager:
+    """
+    Resumable uploads spooled straight to disk. Each upload is a `<id>.part` file plus a
+    small JSON manifest that records how many bytes have been committed, so a client
+    that loses its connection asks for the status and carries on from that offset.
+    Chunks are hashed while they are written and rolled back if the hash does not match.
+    """
+
+    def __init__(self, spool_dir: str):
+        self.spool_dir = spool_dir
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        ensure_dir(self.spool_dir)
+
+    def _paths(self, upload_id: str):
+        # upload_id is always a uuid4 hex; reject anything else before it touches a path.
+        if len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadError("Unknown upload.", 404)
+        base = os.path.join(self.spool_dir, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    def _lock(self, upload_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _read_manifest(self, session_id: str, upload_id: str) -> dict:
+        _, manifest_path = self._paths(upload_id)
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise UploadError("Unknown upload.", 404)
+        if manifest['session_id'] != session_id:
+            raise UploadError("Unknown upload.", 404)
+        return manifest
+
+    def _write_manifest(self, manifest: dict):
+        _, manifest_path = self._paths(manifest['upload_id'])
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def init_upload(self, session_id: str, filename: str, total_size: int, append: bool = False) -> dict:
+        if total_size <= 0:
+            raise UploadError("total_size must be a positive number of bytes.")
+        if total_size > Config.MAX_CHUNKED_UPLOAD_SIZE:
+            raise UploadError("File too large", 413, limit=Config.MAX_CHUNKED_UPLOAD_SIZE)
+
+        self.cleanup_stale()
+        upload_id = uuid.uuid4().hex
+        part_path, _ = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        manifest = {
+            'upload_id': upload_id,
+            'session_id': session_id,
+            'filename': os.path.basename(filename),
+            'total_size': total_size,
+            'received': 0,
+            'append': append,
+            'updated_at': time.time(),
+        }
+        self._write_manifest(manifest)
+        log(f"Initialised chunked upload {upload_id} for '{manifest['filename']}' ({total_size} bytes).")
+        return manifest
+
+    def get_status(self, session_id: str, upload_id: str) -> dict:
+        return self._read_manifest(session_id, upload_id)
+
+    def append_chunk(self, session_id: str, upload_id: str, offset: int, stream: BinaryIO,
+                     expected_sha256: str) -> dict:
+        """
+        Writes one chunk at `offset`, which must equal the committed byte count. The body
+        is copied from `stream` in small buffers, so memory use does not depend on the
+        chunk size.
+        """
+        if not expected_sha256:
+            raise UploadError("Missing chunk checksum.")
+
+        with self._lock(upload_id):
+            manifest = self._read_manifest(session_id, upload_id)
+            if offset != manifest['received']:
+                raise UploadError("Chunk offset does not match the bytes received so far.", 409,
+                                  received=manifest['received'])
+
+            part_path, _ = self._paths(upload_id)
+            remaining = manifest['total_size'] - offset
+            digest = hashlib.sha256()
+            written = 0
+            with open(part_path, 'r+b') as part:
+                part.seek(offset)
+                try:
+                    while True:
+                        buf = stream.read(COPY_BUFFER_SIZE)
+                        if not buf:
+                            break
+                        written += len(buf)
+                        if written > remaining:
+                            raise UploadError("Chunk runs past the declared file size.", 400)
+                        digest.update(buf)
+                        part.write(buf)
+
+                    if written == 0:
+                        raise UploadError("Empty chunk.")
+                    if digest.hexdigest() != expected_sha256.lower():
+                        raise UploadError("Chunk checksum mismatch; resend it.", 422,
+                                          received=manifest['received'])
+                except BaseException:
+                    # Drop whatever part of the chunk made it to disk.
+                    part.truncate(offset)
+                    raise
+
+            manifest['received'] = offset + written
+            manifest['updated_at'] = time.time()
+            self._write_manifest(manifest)
+            return manifest
+
+    def finalize(self, session_id: str, upload_id: str) -> tuple:
+        """
+        Moves a complete upload out of the spool and returns (path, manifest). The
+        caller owns the returned file.
+        """
+        with self._lock(upload_id):
+            manifest = self._read_manifest(session_id, upload_id)
+            if manifest['received'] != manifest['total_size']:
+                raise UploadError("Upload is incomplete.", 409, received=manifest['received'],
+                                  total_size=manifest['total_size'])
+
+            part_path, manifest_path = self._paths(upload_id)
+            ext = os.path.splitext(manifest['filename'])[1]
+            final_path = os.path.join(Config.UPLOAD_FOLDER, f"{upload_id}{ext}")
+            os.replace(part_path, final_path)
+            os.remove(manifest_path)
+
+        with self._locks_guard:
+            self._locks.pop(upload_id, None)
+        return final_path, manifest
+
+    def abort(self, session_id: str, upload_id: str):
+        with self._lock(upload_id):
+            self._read_manifest(session_id, upload_id)
+            for path in self._paths(upload_id):
+                if os.path.exists(path):
+                    os.remove(path)
+        with self._locks_guard:
+            self._locks.pop(upload_id, None)
+
+    def cleanup_stale(self, max_age_seconds: int = None):
+        """Removes uploads that have not received a chunk for `max_age_seconds`."""
+        max_age_seconds = max_age_seconds or Config.CHUNKED_UPLOAD_TTL_SECONDS
+        cutoff = time.time() - max_age_seconds
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    log(f"Removed stale upload file {path}")
+            except OSError:
+                pass
+
+
+_upload_manager_instance = None
+_lock = threading.Lock()
+
+
+def get_upload_manager():
+    global _upload_manager_instance
+    if _upload_manager_instance is None:
+        with _lock:
+            if _upload_manager_instance is None:
+                _upload_manager_instance = ChunkedUploadManager(Config.CHUNKED_UPLOAD_FOLDER)
+    return _upload_manager_instance
@@ -1,24 +1,118 @@
 from .analyzer.chat_analyzer import ChatAnalyzer
+from .analyzer.frame_cache import FrameCache
+from .analyzer.module_cache import ModuleResultCache
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from zipfile import ZipFile, is_zipfile
+from .config import Config
 from .session_manager import session_manager
+from .parsers.archive import is_stream_archive, iter_stream_archive
+from .parsers.fingerprint_index import FingerprintIndex
+from .parsers.parse_cache import ParseCache
+from .parsers.utils import message_fingerprint
 from .parsers.main_parser import (
     process_single_file,
+    filter_unseen_messages,
+    parse_archive_member,
     deduplicate_and_sort_messages
 )
-import tempfile
 from .utils import log
 
 
-def process_file_worker(session_id: str, file_content: bytes, filename: str, progress_callback: callable = None):
+def _parse_zip_members_parallel(archive_path: str, member_names: list, seen: FingerprintIndex, update_progress,
+                                cache_stats: dict) -> list:
+    """
+    Fans ZIP members out to a bounded process pool. Each member is parsed independently;
+    the results are merged back in archive order and deduplicated in one final pass.
+    Parse cache hits and misses reported by the children are added to `cache_stats`.
+    """
+    cache_dir = Config.PARSE_CACHE_FOLDER if Config.PARSE_CACHE_MAX_BYTES > 0 else None
+    total = len(member_names)
+    max_workers = min(Config.PARSE_WORKERS, total)
+    log(f"Parsing {total} archive members with a pool of {max_workers} processes.")
+
+    results = [None] * total
+    # 'spawn' keeps the children clear of the web server's threads and DB pool.
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {
+            executor.submit(parse_archive_member, archive_path, member_name,
+                            cache_dir, Config.PARSE_CACHE_MAX_BYTES, Config.CACHE_MAX_AGE_SECONDS): i
+            for i, member_name in enumerate(member_names)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                results[i], member_stats = future.result()
+                cache_stats['hits'] += member_stats['hits']
+                cache_stats['misses'] += member_stats['misses']
+            except Exception as e:
+                log(f" [WARNING] Failed to parse {member_names[i]}: {e}")
+                results[i] = []
+            log(f"Parsed ({done}/{total}): {member_names[i]}")
+            update_progress(10 + (done / total) * 65, "Parsing files", f"{done}/{total}")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    all_messages = []
+    for member_messages in results:
+        all_messages.extend(filter_unseen_messages(member_messages, seen))
+    return all_messages
+
+
+def _parse_stream_archive(archive_path: str, filename: str, valid_extensions: tuple, seen: FingerprintIndex,
+                          parse_cache, update_progress) -> tuple:
+    """
+    Parses the members of a tar/gzip/zstd upload one at a time as they are decompressed.
+    Progress follows the position in the compressed file, since the member count is
+    unknown until the end. Returns the messages and the number of members parsed.
+    """
+    all_messages = []
+    parsed = 0
+    total_bytes = os.path.getsize(archive_path) or 1
+    with open(archive_path, 'rb') as raw:
+        for member_name, file_obj, rewindable in iter_stream_archive(raw, filename, valid_extensions):
+            parsed += 1
+            setattr(file_obj, 'filename', member_name)
+            log(f"Processing ({parsed}): {member_name}")
+            update_progress(10 + min(raw.tell() / total_bytes, 1) * 65, "Parsing files", member_name)
+            # Hashing for the cache reads the member twice, so only rewindable ones use it.
+            member_cache = parse_cache if rewindable else None
+            all_messages.extend(process_single_file(file_obj, seen, member_cache))
+    return all_messages, parsed
+
+
+def discard_spooled_upload(file_path: str):
+    """Removes an upload spooled for process_file_worker when the task never gets to run."""
+    if os.path.exists(file_path):
+        os.remove(file_path)
+        log(f"Removed spooled upload {file_path} of a task that did not run.")
+
+
+def process_file_worker(session_id: str, file_path: str, filename: str, append: bool = False,
+                        progress_callback: callable = None):
     """
     Processes an uploaded file (which can be a zip or a single chat export file),
     extracts messages, deduplicates them, and stores them in the session.
+
+    With `append`, the upload is merged into the session's existing messages: only
+    messages whose fingerprints are not already stored are kept, and just that delta
+    is written.
+
+    `file_path` points at the upload already spooled to disk by the route. ZIP
+    members are read straight from it, so the raw bytes are never held in memory
+    or in the task queue. The worker owns the spooled file and removes it when done.
     """
     all_messages = []
-    seen_hashes = set()
+    seen = FingerprintIndex()
+    parse_cache = None
+    if Config.PARSE_CACHE_MAX_BYTES > 0:
+        parse_cache = ParseCache(Config.PARSE_CACHE_FOLDER, Config.PARSE_CACHE_MAX_BYTES, Config.CACHE_MAX_AGE_SECONDS)
+        parse_cache.cleanup_stale()  # Expired entries go even when this upload adds none.
+    cache_stats = {'hits': 0, 'misses': 0}
     archives_to_close = []
-    temp_files_to_delete = []
+    temp_files_to_delete = [file_path]
 
     def update_progress(progress, stage, message=""):
         if progress_callback:
@@ -32,18 +126,13 @@ def process_file_worker(session_id: str, file_content: bytes, filename: str, pro
         log(f"Worker starting: processing '{filename}' for session {session_id}.")
         update_progress(5, "Initializing file processing")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_upload_file:
-            temp_upload_file.write(file_content)
-            temp_file_path = temp_upload_file.name
-            temp_files_to_delete.append(temp_file_path)
-
         file_metadata_list = []
         valid_extensions = ('.json', '.html', '.htm')
 
-        if is_zipfile(temp_file_path):
+        if is_zipfile(file_path):
             log(f"Detected ZIP file: {filename}. Extracting members.")
             try:
-                archive = ZipFile(temp_file_path, 'r')
+                archive = ZipFile(file_path, 'r')
                 archives_to_close.append(archive)
 
                 namelist = [
@@ -53,14 +142,19 @@ def process_file_worker(session_id: str, file_content: bytes, filename: str, pro
                        and m.lower().endswith(valid_extensions)
                 ]
                 for member_name in namelist:
-                    file_metadata_list.append({'type': 'zip_member', 'archive_path': temp_file_path, 'member_name': member_name})
+                    file_metadata_list.append({'type': 'zip_member', 'archive_path': file_path, 'member_name': member_name,
+                                               'size': archive.getinfo(member_name).file_size})
             except Exception as e:
                 log(f" [WARNING] Could not read ZIP file {filename}. Skipping. Error: {e}")
+        elif is_stream_archive(filename):
+            log(f"Detected compressed archive: {filename}. Decompressing members as a stream.")
+            file_metadata_list.append({'type': 'stream_archive', 'path': file_path, 'original_filename': filename})
         elif filename.lower().endswith(valid_extensions):
-            file_metadata_list.append({'type': 'single_file', 'path': temp_file_path, 'original_filename': filename})
+            file_metadata_list.append({'type': 'single_file', 'path': file_path, 'original_filename': filename,
+                                       'size': os.path.getsize(file_path)})
         else:
-            log(f" [INFO] Ignoring non-supported file: {os.path.basename(temp_file_path)}")
-            raise ValueError("Unsupported file type. Please upload a .zip, .json, .html, or .htm file.")
+            log(f" [INFO] Ignoring non-supported file: {filename}")
+            raise ValueError("Unsupported file type. Please upload a .zip, .tar(.gz/.zst), .gz, .zst, .json, .html, or .htm file.")
 
 
         total_files_to_process = len(file_metadata_list)
@@ -69,46 +163,83 @@ def process_file_worker(session_id: str, file_content: bytes, filename: str, pro
 
         log(f"Found {total_files_to_process} valid files to process.")
 
-        for i, file_meta in enumerate(file_metadata_list):
-            current_progress = 10 + (i / total_files_to_process) * 65
-            file_obj_to_parse = None
-            filename_for_log = ""
+        if file_metadata_list[0]['type'] == 'stream_archive':
+            all_messages, total_files_to_process = _parse_stream_archive(
+                file_path, filename, valid_extensions, seen, parse_cache, update_progress
+            )
+            if not total_files_to_process:
+                raise ValueError("No processable chat export files (.json, .html, .htm) were found in the upload.")
+            if parse_cache:
+                cache_stats = parse_cache.stats()
+        elif Config.PARSE_WORKERS > 1 and total_files_to_process > 1 and archives_to_close:
+            all_messages = _parse_zip_members_parallel(
+                file_path, [m['member_name'] for m in file_metadata_list], seen, update_progress, cache_stats
+            )
+        else:
+            for i, file_meta in enumerate(file_metadata_list):
+                current_progress = 10 + (i / total_files_to_process) * 65
+                file_obj_to_parse = None
+                filename_for_log = ""
 
-            try:
-                if file_meta['type'] == 'zip_member':
-                    archive_obj = next((arc for arc in archives_to_close if arc.filename == file_meta['archive_path']), None)
-                    if archive_obj:
-                        file_obj_to_parse = archive_obj.open(file_meta['member_name'])
-                        filename_for_log = file_meta['member_name']
-                else:
-                    file_obj_to_parse = open(file_meta['path'], 'rb')
-                    filename_for_log = os.path.basename(file_meta['path'])
-
-                if not file_obj_to_parse:
-                    log(f" [WARNING] Could not open file for metadata: {file_meta}. Skipping.")
-                    continue
-
-                setattr(file_obj_to_parse, 'filename', filename_for_log)
-                log(f"Processing ({i+1}/{total_files_to_process}): {filename_for_log}")
-                update_progress(current_progress, "Parsing files", f"{i+1}/{total_files_to_process}")
-
-                newly_found_messages = process_single_file(file_obj_to_parse, seen_hashes)
-                all_messages.extend(newly_found_messages)
-
-            finally:
-                if file_obj_to_parse:
-                    file_obj_to_parse.close()
+                try:
+                    if file_meta['type'] == 'zip_member':
+                        archive_obj = next((arc for arc in archives_to_close if arc.filename == file_meta['archive_path']), None)
+                        if archive_obj:
+                            file_obj_to_parse = archive_obj.open(file_meta['member_name'])
+                            filename_for_log = file_meta['member_name']
+                    else:
+                        file_obj_to_parse = open(file_meta['path'], 'rb')
+                        filename_for_log = file_meta['original_filename']
+
+                    if not file_obj_to_parse:
+                        log(f" [WARNING] Could not open file for metadata: {file_meta}. Skipping.")
+                        continue
+
+                    setattr(file_obj_to_parse, 'filename', filename_for_log)
+                    log(f"Processing ({i+1}/{total_files_to_process}): {filename_for_log}")
+                    update_progress(current_progress, "Parsing files", f"{i+1}/{total_files_to_process}")
+
+                    # One big file gets no per-file parallelism, so split the file itself instead.
+                    shard_workers = 1
+                    if Config.PARSE_WORKERS > 1 and total_files_to_process == 1 and file_meta['size'] >= Config.SHARD_MIN_BYTES:
+                        shard_workers = Config.PARSE_WORKERS
+
+                    newly_found_messages = process_single_file(file_obj_to_parse, seen, parse_cache, shard_workers)
+                    all_messages.extend(newly_found_messages)
+
+                finally:
+                    if file_obj_to_parse:
+                        file_obj_to_parse.close()
+
+            if parse_cache:
+                cache_stats = parse_cache.stats()
+        log(f"Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
 
         update_progress(75, "Finalizing and sorting")
         processed_messages = deduplicate_and_sort_messages(all_messages)
 
         update_progress(98, "Storing results in session")
-        session_manager.store_processed_messages(session_id, processed_messages)
+        if append:
+            # Fingerprints are taken after normalisation, matching what is stored.
+            stored_index = session_manager.get_fingerprint_index(session_id)
+            previously_stored = len(stored_index)
+            processed_messages = [m for m in processed_messages if stored_index.add(message_fingerprint(m))]
+            session_manager.append_processed_messages(session_id, processed_messages, stored_index)
+            log(f"Appended {len(processed_messages)} new messages to {previously_stored} stored for session {session_id}.")
+        else:
+            session_manager.store_processed_messages(session_id, processed_messages)
         update_progress(100, "File processing completed")
 
+        if append:
+            return {
+                "message": f"Successfully appended {len(processed_messages)} new messages from {total_files_to_process} source file(s).",
+                "unique_senders": session_manager.get_processed_senders(session_id),
+                "parse_cache": cache_stats
+            }
         return {
             "message": f"Successfully processed {len(processed_messages)} messages from {total_files_to_process} source file(s).",
-            "unique_senders": sorted(list({m.get('sender') for m in processed_messages if m.get('sender')}))
+            "unique_senders": sorted(list({m.get('sender') for m in processed_messages if m.get('sender')})),
+            "parse_cache": cache_stats
         }
     except Exception as e:
         log(f"ERROR in file processing worker for session {session_id}: {str(e)}")
@@ -128,8 +259,8 @@ def process_file_worker(session_id: str, file_content: bytes, filename: str, pro
                     log(f"Error cleaning up temp file {temp_file_path}: {e}")
 
 
-def run_analysis_worker(session_id: str, modules_to_run: list = None,
-                        progress_callback: callable = None):
+def run_analysis_worker(session_id: str, modules_to_run: list = None, exclude_info_sharing: bool = True,
+                        force_recompute: bool = False, progress_callback: callable = None):
     def update_progress(progress, stage):
         if progress_callback:
             try:
@@ -157,66 +288,51 @@ def run_analysis_worker(session_id: str, modules_to_run: list = None,
                 stage = step_name or "Running analysis"
                 update_progress(mapped_progress, stage)
 
-        analyzer = ChatAnalyzer(
-            file_path_or_messages=filtered_messages, input_type='messages',
-            progress_callback=analyzer_progress_callback, participants=participants,
-            metadata=metadata, filter_settings=filter_settings
-        )
-        update_progress(10, "Loading and preprocessing data")
-        analyzer.load_and_preprocess()
-
-        update_progress(15, "Running comprehensive analysis")
-        report = analyzer.generate_comprehensive_report(modules_to_run=modules_to_run)
-
-        update_progress(98, "Storing analysis results")
-        session_manager.store_analysis_result(session_id, report)
-        update_progress(100, "Analysis completed")
-
-        return {"message": "Analysis completed successfully!"}
-
-    except Exception as e:
-        log(f"ERROR during analysis worker for session {session_id}: {str(e)}")
-        raise
-
-def run_analysis_worker(session_id: str, modules_to_run: list = None,
-                        progress_callback: callable = None):
-    def update_progress(progress, stage):
-        if progress_callback:
-            try:
-                progress_callback(progress=progress, stage=stage)
-            except Exception as e:
-                log(f"Progress callback error: {e}")
-
-    try:
-        update_progress(5, "Initializing analyzer")
-        filtered_data = session_manager.get_filtered_messages(session_id)
-        if not filtered_data: raise ValueError("No filtered messages found. Please run filtering first.")
-
-        filtered_messages = filtered_data.get('messages', [])
-        metadata = filtered_data.get('metadata', {})
-        filter_settings = filtered_data.get('filter_settings', {})
-        participants = list(metadata.get('participants', {}).keys())
-
-        if not filtered_messages: raise ValueError("No messages found in filtered data.")
-
-        log(f"Found {len(participants)} participants: {participants}")
-
-        def analyzer_progress_callback(progress_percent=None, step_name=None, **kwargs):
-            if progress_percent is not None:
-                mapped_progress = 10 + (progress_percent * 0.85)
-                stage = step_name or "Running analysis"
-                update_progress(mapped_progress, stage)
+        module_cache = None
+        if Config.MODULE_CACHE_MAX_ENTRIES > 0:
+            module_cache = ModuleResultCache.from_dict(session_manager.get_module_cache(session_id),
+                                                       Config.MODULE_CACHE_MAX_ENTRIES)
 
         analyzer = ChatAnalyzer(
             file_path_or_messages=filtered_messages, input_type='messages',
             progress_callback=analyzer_progress_callback, participants=participants,
-            metadata=metadata, filter_settings=filter_settings
+            metadata=metadata, filter_settings=filter_settings,
+            compact_schema=Config.COMPACT_ANALYSIS_SCHEMA,
+            max_workers=Config.ANALYSIS_WORKERS, process_workers=Config.ANALYSIS_PROCESS_WORKERS,
+            trace_memory=Config.ANALYSIS_TRACE_MEMORY,
+            module_cache=module_cache, force_recompute=force_recompute
         )
-        update_progress(10, "Loading and preprocessing data")
-        analyzer.load_and_preprocess()
-
-        update_progress(15, "Running comprehensive analysis")
-        report = analyzer.generate_comprehensive_report(modules_to_run=modules_to_run)
+        # With ANALYSIS_TRACE_MEMORY, tracemalloc runs for this analysis only.
+        with analyzer.performance.tracing():
+            update_progress(10, "Loading and preprocessing data")
+            frame_cache = None
+            if Config.FRAME_CACHE_MAX_BYTES > 0:
+                frame_cache = FrameCache(Config.FRAME_CACHE_FOLDER, Config.FRAME_CACHE_MAX_BYTES,
+                                         Config.CACHE_MAX_AGE_SECONDS)
+                frame_cache.cleanup_stale()  # Expired entries go even when this run is a cache hit.
+            # Only the columns these modules read are computed.
+            analyzer.load_and_preprocess(
+                frame_cache=frame_cache, columns=analyzer.required_columns(modules_to_run, exclude_info_sharing)
+            )
+            if analyzer.frame_cache_hit:
+                log(f"Reused cached preprocessed frame for session {session_id}.")
+            memory = analyzer.memory_report()
+            log(f"Analysis frame for session {session_id}: {memory['rows']} rows, "
+                f"{memory['total_bytes'] / 1024 / 1024:.1f} MB ({memory['schema']} schema).")
+
+            update_progress(15, "Running comprehensive analysis")
+            report = analyzer.generate_comprehensive_report(modules_to_run=modules_to_run,
+                                                            exclude_info_sharing=exclude_info_sharing)
+        cached_modules = [name for name, m in analyzer.performance.modules.items() if m.get('cached')]
+        if cached_modules:
+            log(f"Reused cached results for {len(cached_modules)} modules: {', '.join(cached_modules)}")
+        if module_cache is not None and module_cache.dirty:
+            # Another analysis of this session may have stored results since ours were loaded.
+            module_cache.merge(session_manager.get_module_cache(session_id))
+            session_manager.store_module_cache(session_id, module_cache.to_dict())
+        log(f"Analysis cost for session {session_id}:")
+        for line in analyzer.performance.summary_lines():
+            log(f"  {line}")
 
         update_progress(98, "Storing analysis results")
         session_manager.store_analysis_result(session_id, report)
@@ -0,0 +1,230 @@
+"""
+Throughput of the info-sharing detector: the frozen per-pattern implementation it
+replaced versus InfoSharingScanner. Also checks that both give the same result.
+
+    python -m benchmarks.info_sharing_bench [messages.json] [--count N]
+
+Without a file, a synthetic corpus of chat-like and news-like messages is used. A
+file may be a processed-messages export (a JSON list of {"message": ...} objects).
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import Any, Dict
+
+from api.analyzer.info_sharing import detect_info_sharing
+
+
+def legacy_detect_info_sharing(message: str) -> Dict[str, Any]:
+    if not isinstance(message, str) or len(message.strip()) == 0:
+        return {
+            'is_info_sharing': False,
+            'confidence': 0.0,
+            'indicators': [],
+            'category': None
+        }
+
+    message = message.strip()
+    indicators = []
+    confidence_score = 0.0
+    category = None
+
+    # Pattern 1: News/Article indicators
+    news_patterns = [
+        r'\b(has since|according to|it is reported|sources say|officials said)\b',
+        r'\b(government|ministry|official|spokesperson|representative)\b',
+        r'\b(announced|declared|stated|confirmed|revealed)\b',
+        r'\b(policy|agreement|treaty|declaration|resolution)\b',
+        r'\b(meeting|conference|summit|talks|negotiations)\b',
+        r'\b(dispute|conflict|tension|dialogue|consultation)\b'
+    ]
+
+    # Pattern 2: Formal announcements
+    announcement_patterns = [
+        r'\b(call for papers|deadline|submission|application)\b',
+        r'\b(pleased to announce|we are announcing|it is announced)\b',
+        r'\b(timeline|schedule|dates|registration)\b',
+        r'\b(conference|workshop|seminar|symposium)\b',
+        r'\b(partnership|collaboration|in cooperation with)\b',
+        r'\b(interested candidates|applicants|participants)\b'
+    ]
+
+    # Pattern 3: Academic/Formal writing indicators
+    formal_patterns = [
+        r'\b(furthermore|however|nevertheless|therefore|consequently)\b',
+        r'\b(in conclusion|in summary|to summarize|in other words)\b',
+        r'\b(research|study|analysis|findings|methodology)\b',
+        r'\b(implementation|framework|guidelines|provisions)\b'
+    ]
+
+    # Pattern 4: Quotation marks around large blocks (news quotes)
+    quote_patterns = [
+        r'"[^"]{100,}"',  # Long quoted text (100+ chars)
+        r'["""][^"""]{100,}["""]'  # Smart quotes with long content
+    ]
+
+    # Pattern 5: Formal dates and times
+    date_patterns = [
+        r'\b\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\b',
+        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
+        r'\b\d{2}:\d{2}\s*(AM|PM|am|pm)\b'
+    ]
+
+    # Pattern 6: Organizational/Institutional names
+    org_patterns = [
+        r'\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b',  # Acronyms like ASEAN, DOC, COC
+        r'\b(Academy|University|Institute|Foundation|Organization|Association)\b',
+        r'\b(Cambodia|ASEAN|China|Beijing|Ministry|Department)\b'
+    ]
+
+    # Pattern 7: Professional/Academic language
+    professional_patterns = [
+        r'\b(implementation|coordination|consultations|provisions|bilateral)\b',
+        r'\b(digital transformation|skills gap|practitioners|candidates)\b',
+        r'\b(volume|publication|manuscript|submission|proposal)\b'
+    ]
+
+    # Check each pattern category
+    pattern_categories = [
+        ('news', news_patterns),
+        ('announcement', announcement_patterns),
+        ('formal', formal_patterns),
+        ('academic', professional_patterns)
+    ]
+
+    for cat_name, patterns in pattern_categories:
+        matches = 0
+        for pattern in patterns:
+            if re.search(pattern, message, re.IGNORECASE):
+                matches += 1
+                indicators.append(f"{cat_name}_language")
+
+        if matches >= 2:  # Multiple matches in same category
+            confidence_score += 0.3
+            if not category:
+                category = cat_name
+
+    # Check quote patterns
+    for pattern in quote_patterns:
+        if re.search(pattern, message):
+            confidence_score += 0.4
+            indicators.append('long_quotes')
+            if not category:
+                category = 'quoted_content'
+
+    # Check date patterns
+    date_matches = sum(1 for pattern in date_patterns if re.search(pattern, message))
+    if date_matches >= 2:
+        confidence_score += 0.2
+        indicators.append('formal_dates')
+
+    # Check organizational patterns
+    org_matches = sum(1 for pattern in org_patterns if re.search(pattern, message))
+    if org_matches >= 3:
+        confidence_score += 0.3
+        indicators.append('organizational_names')
+
+    # Additional heuristics
+    word_count = len(message.split())
+
+    # Very long messages with formal structure
+    if word_count > 100:
+        sentences = re.split(r'[.!?]+', message)
+        valid_sentences = [s for s in sentences if s.strip()]
+        if valid_sentences:
+            avg_sentence_length = sum(len(s.split()) for s in valid_sentences) / len(valid_sentences)
+
+            if avg_sentence_length > 15:  # Long, complex sentences
+                confidence_score += 0.2
+                indicators.append('complex_sentences')
+
+    # Check for lack of personal pronouns (less personal)
+    personal_pronouns = re.findall(r'\b(I|me|my|mine|you|your|yours|we|us|our|ours)\b', message, re.IGNORECASE)
+    pronoun_ratio = len(personal_pronouns) / max(word_count, 1)
+
+    if pronoun_ratio < 0.02 and word_count > 50:  # Very few personal pronouns in longer text
+        confidence_score += 0.2
+        indicators.append('impersonal_tone')
+
+    # Check for formal punctuation patterns
+    if re.search(r':\s*$', message) or message.count(';') >= 2:
+        confidence_score += 0.1
+        indicators.append('formal_punctuation')
+
+    # Cap confidence at 1.0
+    confidence_score = min(confidence_score, 1.0)
+
+    # Determine if it's information sharing (threshold: 0.4)
+    is_info_sharing = confidence_score >= 0.4
+
+    return {
+        'is_info_sharing': is_info_sharing,
+        'confidence': round(confidence_score, 3),
+        'indicators': list(set(indicators)),  # Remove duplicates
+        'category': category,
+        'word_count': word_count
+    }
+
+
+CHAT_WORDS = ("ok lol haha sure see you tomorrow I miss you where are we going my phone "
+              "died what time do you finish dinner tonight love it yes no maybe").split()
+NEWS_WORDS = ("the government announced a new policy agreement according to officials said "
+              "the ministry confirmed the summit talks dispute furthermore research findings "
+              "framework implementation ASEAN Cambodia China University conference deadline "
+              "submission interested candidates in cooperation with bilateral publication").split()
+
+
+def synthetic_corpus(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        if rng.random() < 0.85:
+            words = [rng.choice(CHAT_WORDS) for _ in range(rng.randint(1, 20))]
+        else:
+            words = [rng.choice(NEWS_WORDS + CHAT_WORDS) for _ in range(rng.randint(40, 250))]
+        messages.append(' '.join(words) + rng.choice(['', '.', '?', '!', ':', '; ok;']))
+    return messages
+
+
+def load_corpus(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('messages', [])
+    return [m.get('message', '') if isinstance(m, dict) else str(m) for m in data]
+
+
+def measure(func, messages: list) -> tuple:
+    start = time.perf_counter()
+    results = [func(m) for m in messages]
+    elapsed = time.perf_counter() - start
+    return results, len(messages) / elapsed if elapsed else float('inf')
+
+
+def _normalized(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {**result, 'indicators': sorted(result['indicators'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', help="JSON file of messages; synthetic corpus if omitted")
+    parser.add_argument('--count', type=int, default=20000, help="synthetic corpus size")
+    args = parser.parse_args()
+
+    messages = load_corpus(args.path) if args.path else synthetic_corpus(args.count)
+    detect_info_sharing('warm up')  # Builds the scanner outside the timed loop.
+
+    legacy_results, legacy_rate = measure(legacy_detect_info_sharing, messages)
+    scanner_results, scanner_rate = measure(detect_info_sharing, messages)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, scanner_results) if _normalized(a) != _normalized(b))
+    print(f"messages:   {len(messages)}")
+    print(f"legacy:     {legacy_rate:,.0f} msgs/sec")
+    print(f"scanner:    {scanner_rate:,.0f} msgs/sec ({scanner_rate / legacy_rate:.1f}x)")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -278,6 +278,22 @@ export interface InfoSharingStats {
     confidence_threshold_used: number;
 }
 
+export interface StepPerformance {
+    rows: number;
+    wall_seconds: number;
+    cpu_seconds: number;
+    peak_allocated_bytes?: number;
+    max_rss_growth_bytes?: number;
+    cached?: boolean;
+}
+
+export interface AnalysisPerformance {
+    preprocessing: Record<string, StepPerformance>;
+    modules: Record<string, StepPerformance>;
+    memory_tracing: boolean;
+    peak_rss_bytes: number | null;
+}
+
 export interface AnalysisResult {
     dataset_overview?: DatasetOverview;
     first_last_messages?: FirstLastMessages;
@@ -310,4 +326,5 @@ export interface AnalysisResult {
     info_sharing_stats?: InfoSharingStats;
     metadata?: Record<string, any>;
     filter_settings?: Record<string, any>;
+    _performance?: AnalysisPerformance;
 }